@@ -0,0 +1,128 @@
+"""
+Locator lookup benchmark.
+
+Compares the XPath locators the suite used to send with their typed ID/CSS
+replacements against benchmarks/fixtures/inventory.html in headless Chrome.
+Each locator is timed two ways: as a WebDriver find_element round trip, and
+as a lookup inside the page (document.evaluate against getElementById or
+querySelector) to isolate the browser's own cost from the round trip.
+
+Usage:
+    python -m benchmarks.locator_benchmark
+    python -m benchmarks.locator_benchmark --items 1000 --repeat 50
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from selenium.webdriver.common.by import By
+
+from features.locators import Locator, Locators
+from pages.base_page import RESOLVE_LOCATOR_JS
+from utils.browser_pool import create_chrome_driver
+from utils.driver_resolver import stop_shared_service
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "inventory.html"
+
+# Last product the fixture renders, so a contains() XPath scans the whole page
+LAST_PRODUCT = "Sauce Labs Item {items}"
+
+# Runs `iterations` lookups of one locator in the page and returns the elapsed ms
+IN_PAGE_LOOKUP_SCRIPT = RESOLVE_LOCATOR_JS + """
+const [locator, iterations] = arguments;
+const started = performance.now();
+for (let i = 0; i < iterations; i++) {
+    if (!resolveLocator(locator)) return -1;
+}
+return performance.now() - started;
+"""
+
+
+def cases(items: int) -> List[Tuple[str, str, Locator]]:
+    """(name, XPath the suite used to send, typed locator now used) triples"""
+    product = LAST_PRODUCT.format(items=items)
+    slug = product.lower().replace(" ", "-")
+    return [
+        ("LOGIN_BUTTON", "//input[@id='login-button']", Locators.LOGIN_BUTTON),
+        ("USERNAME_FIELD", "//input[@id='user-name']", Locators.USERNAME_FIELD),
+        ("INVENTORY_CONTAINER", "//*[@id='inventory_container']", Locators.INVENTORY_CONTAINER),
+        ("CART_ICON", "//a[@data-test='shopping-cart-link']", Locators.CART_ICON),
+        ("ERROR_MESSAGE_CONTAINER", "//h3[@data-test='error']", Locators.ERROR_MESSAGE_CONTAINER),
+        ("LOGOUT", "//a[@id='logout_sidebar_link']", Locators.LOGOUT),
+        ("add_to_cart_button", f"//button[contains(@id, 'add-to-cart-{slug}')]",
+         Locators.add_to_cart_button(product)),
+    ]
+
+
+def time_find_element(driver, by: str, value: str, repeat: int) -> float:
+    """Median ms of a find_element round trip"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        driver.find_element(by, value)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def time_in_page(driver, locator: Locator, iterations: int) -> float:
+    """Mean µs per lookup inside the page, without WebDriver overhead"""
+    elapsed_ms = driver.execute_script(IN_PAGE_LOOKUP_SCRIPT, list(locator), iterations)
+    if elapsed_ms < 0:
+        raise LookupError(f"{locator} not found in the fixture")
+    return elapsed_ms * 1000 / iterations
+
+
+def run(driver, items: int, repeat: int, iterations: int) -> List[dict]:
+    driver.get(f"{FIXTURE.as_uri()}?items={items}")
+    results = []
+    for name, xpath, locator in cases(items):
+        # Warm up both forms so first-use compilation is not measured
+        driver.find_element(By.XPATH, xpath)
+        driver.find_element(*locator)
+        results.append({
+            "locator": name,
+            "strategy": locator.by,
+            "xpath_ms": time_find_element(driver, By.XPATH, xpath, repeat),
+            "typed_ms": time_find_element(driver, locator.by, locator.value, repeat),
+            "xpath_us": time_in_page(driver, Locator.xpath(xpath), iterations),
+            "typed_us": time_in_page(driver, locator, iterations),
+        })
+    return results
+
+
+def print_table(results: List[dict], items: int) -> None:
+    print(f"Locator lookups, {items} inventory items "
+          f"(find_element median ms | in-page mean µs per lookup)")
+    print(f"{'locator':<26}{'strategy':<14}{'xpath ms':>10}{'typed ms':>10}"
+          f"{'xpath µs':>11}{'typed µs':>11}{'speedup':>9}")
+    for row in results:
+        speedup = row["xpath_us"] / row["typed_us"] if row["typed_us"] else float("inf")
+        print(f"{row['locator']:<26}{row['strategy']:<14}{row['xpath_ms']:>10.2f}{row['typed_ms']:>10.2f}"
+              f"{row['xpath_us']:>11.2f}{row['typed_us']:>11.2f}{speedup:>8.1f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark XPath against typed ID/CSS locators")
+    parser.add_argument("--items", type=int, default=200, help="inventory items rendered in the fixture")
+    parser.add_argument("--repeat", type=int, default=30, help="find_element calls per locator")
+    parser.add_argument("--iterations", type=int, default=2000, help="in-page lookups per locator")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    driver = create_chrome_driver()
+    try:
+        print_table(run(driver, args.items, args.repeat, args.iterations), args.items)
+    finally:
+        driver.quit()
+        stop_shared_service()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Statistics for comparing benchmark samples against a baseline.
+
+Uses the Mann-Whitney U test (normal approximation with tie and continuity
+corrections), which makes no assumption about the shape of timing
+distributions and tolerates the outliers they usually have.
+"""
+
+import math
+from typing import List, Sequence, Tuple
+
+
+def ranks(values: Sequence[float]) -> List[float]:
+    """1-based ranks of values, ties sharing their average rank"""
+    order = sorted(range(len(values)), key=lambda index: values[index])
+    result = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        average = (start + end) / 2 + 1
+        for position in range(start, end + 1):
+            result[order[position]] = average
+        start = end + 1
+    return result
+
+
+def mann_whitney_u(current: Sequence[float], baseline: Sequence[float]) -> Tuple[float, float]:
+    """One-sided p-values that current is (slower, faster) than baseline"""
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0, 1.0
+    combined = list(current) + list(baseline)
+    ranked = ranks(combined)
+    u = sum(ranked[:n1]) - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+
+    n = n1 + n2
+    ties = {}
+    for value in combined:
+        ties[value] = ties.get(value, 0) + 1
+    tie_term = sum(t ** 3 - t for t in ties.values()) / (n * (n - 1))
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0, 1.0
+    sd = math.sqrt(variance)
+
+    z_slower = (u - mean - 0.5) / sd
+    z_faster = (mean - u - 0.5) / sd
+    return _upper_tail(z_slower), _upper_tail(z_faster)
+
+
+def _upper_tail(z: float) -> float:
+    return 0.5 * math.erfc(z / math.sqrt(2))
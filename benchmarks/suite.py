@@ -0,0 +1,404 @@
+"""
+Benchmarks for the harness's own hot paths.
+
+Measures the framework's overhead apart from the system under test: step
+matching for login.feature, schema loading and validation, booking payload
+building and BasePage operations against a static page in headless Chrome.
+Browser benchmarks are skipped when Chrome cannot be launched.
+
+Results hold every sample, so a run can be compared against a baseline in
+benchmarks/baseline.json with a Mann-Whitney U test. A benchmark is flagged
+only when it is both significantly and materially slower. Benchmarks that
+are in only one of the two runs are reported as missing and fail the
+comparison. Baselines are machine-specific and not committed: create one
+with --save-baseline on the machine that runs the comparison. Chrome must be
+available there, since a baseline without the browser benchmarks is refused.
+
+Usage:
+    python -m benchmarks.suite run
+    python -m benchmarks.suite run --only schema --output results.json
+    python -m benchmarks.suite run --save-baseline
+    python -m benchmarks.suite compare results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.stats import mann_whitney_u
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "inventory.html"
+
+# Bump when the results layout changes; compare refuses mismatched files
+RESULTS_FORMAT = 1
+
+DEFAULT_SAMPLES = 20
+# Loops per sample are doubled until one sample takes at least this long
+MIN_SAMPLE_SECONDS = 0.05
+# Smallest median slowdown worth failing on, however significant
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_ALPHA = 0.01
+
+# name -> (factory, needs_browser); a factory does its setup and returns the operation
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, needs_browser: bool = False):
+    """Register a benchmark factory under name"""
+    def decorator(factory):
+        BENCHMARKS[name] = (factory, needs_browser)
+        return factory
+    return decorator
+
+
+# ============================================================================
+# Step matching
+# ============================================================================
+
+@benchmark("steps.match_login_feature")
+def bench_step_matching(_driver=None) -> Callable[[], None]:
+    """Match every step of login.feature against the login step definitions"""
+    from behave.parser import parse_file
+    from behave.runner_util import exec_file
+    from behave.step_registry import registry
+
+    if not registry.steps["given"]:
+        exec_file(str(ROOT / "features" / "steps" / "login_steps.py"))
+    feature = parse_file(str(ROOT / "features" / "login.feature"))
+    steps = list(feature.background.steps)
+    for scenario in feature.walk_scenarios():
+        steps.extend(scenario.steps)
+
+    def operation():
+        for step in steps:
+            registry.find_match(step)
+    return operation
+
+
+# ============================================================================
+# Schemas
+# ============================================================================
+
+def _api_feature_rows() -> dict:
+    """First table row of each api.feature step that has a table, by step text"""
+    from behave.parser import parse_file
+
+    feature = parse_file(str(ROOT / "features" / "api.feature"))
+    rows = {}
+    for scenario in [feature.background, *feature.walk_scenarios()]:
+        for step in scenario.steps:
+            if step.table:
+                rows.setdefault(step.name, step.table[0])
+    return rows
+
+
+@benchmark("schemas.registry_load")
+def bench_schema_load(_driver=None) -> Callable[[], None]:
+    """Load and compile every schema, as before_all does"""
+    from utils.schema_loader import SchemaRegistry
+    return SchemaRegistry
+
+
+@benchmark("schemas.validate_booking")
+def bench_schema_validate(_driver=None) -> Callable[[], None]:
+    """Validate a booking against the compiled booking schema"""
+    from utils.booking_payloads import booking_details_from_row, booking_request_body
+    from utils.schema_loader import SchemaRegistry
+
+    schemas = SchemaRegistry()
+    row = _api_feature_rows()["I have a new hotel booking with the following details"]
+    instance = booking_request_body(booking_details_from_row(row))
+    return lambda: schemas.validate("booking_schema.json", instance)
+
+
+# ============================================================================
+# Payloads
+# ============================================================================
+
+@benchmark("payloads.build_from_tables")
+def bench_payloads(_driver=None) -> Callable[[], None]:
+    """Build create, update and partial update bodies from api.feature rows"""
+    from utils.booking_payloads import (
+        booking_details_from_row,
+        booking_request_body,
+        partial_update_from_row,
+    )
+
+    rows = _api_feature_rows()
+    create = rows["I have a new hotel booking with the following details"]
+    update = rows["I have updated booking details"]
+    partial = rows["I want to update specific booking details"]
+
+    def operation():
+        booking_request_body(booking_details_from_row(create))
+        booking_request_body(booking_details_from_row(update))
+        partial_update_from_row(partial)
+    return operation
+
+
+# ============================================================================
+# BasePage in headless Chrome
+# ============================================================================
+
+def _fixture_page(driver):
+    from pages.base_page import BasePage
+    driver.get(FIXTURE.as_uri())
+    return BasePage(driver)
+
+
+@benchmark("base_page.find_element", needs_browser=True)
+def bench_find_element(driver) -> Callable[[], None]:
+    from features.locators import Locators
+    page = _fixture_page(driver)
+    return lambda: page.find_element(Locators.add_to_cart_button("Sauce Labs Item 200"))
+
+
+@benchmark("base_page.snapshot", needs_browser=True)
+def bench_snapshot(driver) -> Callable[[], None]:
+    from features.locators import Locators
+    from pages.base_page import invalidate_page_state
+    page = _fixture_page(driver)
+
+    def operation():
+        invalidate_page_state(driver)
+        page.snapshot(required=[Locators.INVENTORY_CONTAINER],
+                      extra=[Locators.CART_ICON, Locators.ERROR_MESSAGE_CONTAINER])
+    return operation
+
+
+@benchmark("base_page.fill_form", needs_browser=True)
+def bench_fill_form(driver) -> Callable[[], None]:
+    from features.locators import Locators
+    page = _fixture_page(driver)
+    fills = [(Locators.USERNAME_FIELD, "standard_user"), (Locators.PASSWORD_FIELD, "secret_sauce")]
+    return lambda: page.fill_form(fills)
+
+
+@benchmark("base_page.is_element_visible", needs_browser=True)
+def bench_is_element_visible(driver) -> Callable[[], None]:
+    from features.locators import Locators
+    page = _fixture_page(driver)
+    return lambda: page.is_element_visible(Locators.ERROR_MESSAGE_CONTAINER)
+
+
+# ============================================================================
+# Running
+# ============================================================================
+
+def measure(operation: Callable[[], None], samples: int) -> dict:
+    """Per-operation time in µs for each sample, with loops sized by autorange"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        loops *= 2
+
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        timings.append((time.perf_counter() - started) / loops * 1e6)
+    return {"unit": "us", "loops": loops, "median": statistics.median(timings), "samples": timings}
+
+
+def _launch_browser():
+    from selenium.common.exceptions import WebDriverException
+
+    from utils.browser_pool import create_chrome_driver
+    try:
+        return create_chrome_driver()
+    except WebDriverException as error:
+        logger.warning("Chrome unavailable, skipping browser benchmarks: %s", error.msg)
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: List[str], samples: int) -> dict:
+    """Run the named benchmarks and return results with environment metadata"""
+    results = {}
+    driver = None
+    browser_tried = False
+    try:
+        for name in names:
+            factory, needs_browser = BENCHMARKS[name]
+            if needs_browser and not browser_tried:
+                browser_tried = True
+                driver = _launch_browser()
+            if needs_browser and driver is None:
+                continue
+            results[name] = measure(factory(driver), samples)
+            logger.info("%s: %.2f µs", name, results[name]["median"])
+    finally:
+        if driver is not None:
+            from utils.driver_resolver import stop_shared_service
+            driver.quit()
+            stop_shared_service()
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "benchmarks": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            alpha: float = DEFAULT_ALPHA) -> List[dict]:
+    """Classify each benchmark as slower, faster or unchanged, or missing from one of the runs"""
+    rows = []
+    for name in sorted(set(current["benchmarks"]) | set(baseline["benchmarks"])):
+        now, before = current["benchmarks"].get(name), baseline["benchmarks"].get(name)
+        if now is None or before is None:
+            rows.append({
+                "benchmark": name,
+                "baseline_us": before["median"] if before else None,
+                "current_us": now["median"] if now else None,
+                "ratio": None,
+                "p_value": None,
+                "verdict": "MISSING",
+            })
+            continue
+        ratio = now["median"] / before["median"] if before["median"] else float("inf")
+        p_slower, p_faster = mann_whitney_u(now["samples"], before["samples"])
+        if p_slower < alpha and ratio >= 1 + threshold:
+            verdict = "SLOWER"
+        elif p_faster < alpha and ratio <= 1 - threshold:
+            verdict = "faster"
+        else:
+            verdict = "same"
+        rows.append({
+            "benchmark": name,
+            "baseline_us": before["median"],
+            "current_us": now["median"],
+            "ratio": ratio,
+            "p_value": p_slower if ratio >= 1 else p_faster,
+            "verdict": verdict,
+        })
+    return rows
+
+
+def print_comparison(rows: List[dict], current: dict, baseline: dict) -> None:
+    print(f"Baseline {baseline.get('commit') or '?'} ({baseline.get('created')}, {baseline.get('machine')}) "
+          f"vs current {current.get('commit') or '?'}")
+    if baseline.get("machine") != current.get("machine"):
+        print(f"Warning: baseline was recorded on {baseline.get('machine')!r}, this run on "
+              f"{current.get('machine')!r}; timings from different machines are not comparable")
+    print(f"{'benchmark':<34}{'baseline µs':>13}{'current µs':>13}{'ratio':>8}{'p':>9}  verdict")
+    for row in rows:
+        if row["verdict"] == "MISSING":
+            where = "baseline" if row["baseline_us"] is None else "current run"
+            print(f"{row['benchmark']:<34}{_us(row['baseline_us']):>13}{_us(row['current_us']):>13}"
+                  f"{'-':>8}{'-':>9}  MISSING (not in {where})")
+            continue
+        print(f"{row['benchmark']:<34}{row['baseline_us']:>13.2f}{row['current_us']:>13.2f}"
+              f"{row['ratio']:>8.2f}{row['p_value']:>9.4f}  {row['verdict']}")
+
+
+def _us(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def _load(path: Path) -> dict:
+    try:
+        with open(path, "r") as f:
+            results = json.load(f)
+    except FileNotFoundError:
+        raise SystemExit(f"No results at {path}; create a baseline on this machine with "
+                         "`python -m benchmarks.suite run --save-baseline`") from None
+    if results.get("format") != RESULTS_FORMAT:
+        raise SystemExit(f"{path} has results format {results.get('format')}, expected {RESULTS_FORMAT}")
+    return results
+
+
+def _write(results: dict, path: Path) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the test harness and compare against a baseline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--only", action="append", default=[],
+                            help="run benchmarks whose name contains this (repeatable)")
+    run_parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    run_parser.add_argument("--output", help="write the JSON results to this file")
+    run_parser.add_argument("--save-baseline", action="store_true",
+                            help=f"write the results to {BASELINE.relative_to(ROOT)} (every benchmark must run)")
+    run_parser.add_argument("--compare", action="store_true",
+                            help="compare the results against the baseline")
+
+    compare_parser = commands.add_parser("compare", help="compare a results file against the baseline")
+    compare_parser.add_argument("results")
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--baseline", default=str(BASELINE))
+        sub.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="smallest median slowdown to flag, as a fraction")
+        sub.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    if args.command == "run":
+        names = [name for name in BENCHMARKS if not args.only or any(part in name for part in args.only)]
+        current = run(names, args.samples)
+        if args.output:
+            _write(current, Path(args.output))
+        if args.save_baseline:
+            skipped = [name for name in BENCHMARKS if name not in current["benchmarks"]]
+            if skipped:
+                logger.error("Not saving a baseline without %s; run every benchmark, with Chrome available",
+                             ", ".join(skipped))
+                return 1
+            _write(current, Path(args.baseline))
+        for name, result in current["benchmarks"].items():
+            print(f"{name:<34}{result['median']:>12.2f} µs  ({result['loops']} loops x {args.samples})")
+        if not args.compare:
+            return 0
+    else:
+        current = _load(Path(args.results))
+
+    baseline = _load(Path(args.baseline))
+    if args.command == "run" and args.only:
+        # Only the selected benchmarks are expected in this run
+        baseline = dict(baseline, benchmarks={
+            name: result for name, result in baseline["benchmarks"].items() if name in names
+        })
+    rows = compare(current, baseline, args.threshold, args.alpha)
+    print_comparison(rows, current, baseline)
+    return 1 if any(row["verdict"] in ("SLOWER", "MISSING") for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
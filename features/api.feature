@@ -16,6 +16,12 @@ Feature: Hotel Booking Management
     Then the booking should be created successfully
     And I should receive a booking confirmation
 
+  @data-driven @sharded @create
+  Scenario: Create bookings streamed from a data file
+    Given booking details are streamed from "bookings.jsonl"
+    When I create a booking for each streamed row
+    Then every streamed booking should be created with its details
+
   @smoke @read
   Scenario: Retrieve booking details
     Given a booking has been created
@@ -23,6 +29,14 @@ Feature: Hotel Booking Management
     Then I should receive the correct booking information
     And the booking data should be valid
 
+  @read @latency @skip-ci
+  Scenario: Retrieve booking details within the latency SLA
+    Given a booking has been created
+    When I request the booking details 500 times with 20 concurrent clients
+    Then all requests should succeed
+    And the p95 latency should be below 200 ms
+    And the p99 latency should be below 500 ms
+
   @update @full
   Scenario: Update booking with complete information
     Given a booking has been created
@@ -34,6 +48,16 @@ Feature: Hotel Booking Management
     And I should receive the updated booking details
     And the booking data should be valid
 
+  @update @latency @skip-ci
+  Scenario: Update booking within the latency SLA
+    Given a booking has been created
+    And I have updated booking details
+      | firstname | lastname | totalprice | depositpaid | checkin    | checkout   | additionalneeds |
+      | Jon       | Doh      | 350        | false       | 2029-08-24 | 2029-09-01 | 9 towels        |
+    When I update the booking 200 times with 10 concurrent clients
+    Then all requests should succeed
+    And the p95 latency should be below 250 ms
+
   @update @partial
   Scenario: Partially update booking information
     Given a booking has been created
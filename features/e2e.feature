@@ -3,8 +3,7 @@ Feature: User purchase flow
 
 Background: User is logged in
     Given a user is on the login page
-    When the user enters "standard_user" and "secret_sauce"
-    Then the user is able to login
+    And the user is logged in with "standard_user" and "secret_sauce"
 
   Scenario Outline: User adds a product to the cart and checks out
     When the user adds the product "<product_name>" to the cart
@@ -3,54 +3,136 @@ This module contains the Selenium env setup.
 """
 
 import logging
+import os
+
+from utils.booker_stub import BookerStubServer
+from utils.booking_payloads import booking_details_from_row
+from utils.booking_pool import BookingPool
+from utils.browser_pool import FRESH_BROWSER_TAG, BrowserPool
+from utils.browser_profile import ProfileTemplate
+from utils.driver_commands import CommandRecorder, scenario_budget
+from utils.http_client import HttpClient
+from utils.network_policy import NetworkPolicy
+from utils.schema_loader import SchemaRegistry
+from utils.session_cache import SessionCache
+from utils.step_trace import StepTracer
+from utils.test_selection import CoverageRecorder
+from utils.token_cache import TokenCache
+
+DEFAULT_BASE_URL = "http://localhost:3001/"
+
+# Background step whose table describes the bookings API scenarios work on
+BOOKING_DETAILS_STEP = "I have a new hotel booking with the following details"
 
 
 def before_all(context):
-    """Setup logging"""
+    """Setup logging and the run's shared clients, caches and pools"""
     logging.basicConfig(level=logging.INFO)
+    context.base_url = os.getenv("BASE_URL", DEFAULT_BASE_URL)
+    if os.getenv("BOOKER_STUB", "").lower() in ("1", "true", "yes"):
+        # Serve the API in-process on an ephemeral port instead of Docker
+        context.booker_stub = BookerStubServer().start()
+        context.base_url = context.booker_stub.base_url
+    context.http = HttpClient.from_env()
+    # Auth tokens shared by parallel workers, and booking fixtures created ahead of the scenarios
+    context.token_cache = TokenCache.from_env()
+    context.booking_pool = BookingPool.from_env(context.base_url, context.token_cache)
+    context.schemas = SchemaRegistry()
+    # One reusable Chrome per worker, started from a warmed profile when BROWSER_PROFILE_WARMUP is set
+    context.browser_pool = BrowserPool(profile=ProfileTemplate.from_env())
+    context.network_policy = NetworkPolicy.from_env()
+    context.session_cache = SessionCache()
+    context.driver_commands = CommandRecorder()
+    # Requests sent by latency bursts on their own clients
+    context.burst_requests = {"sent": 0}
+    # Optional step trace (STEP_TRACE) and scenario coverage map (SCENARIO_COVERAGE_MAP)
+    context.step_tracer = StepTracer.from_env(lambda: {
+        "webdriver_commands": context.driver_commands.count,
+        "http_requests": context.http.requests_sent,
+        "burst_requests": context.burst_requests["sent"],
+    })
+    context.coverage_map = CoverageRecorder.from_env()
+
+
+def before_feature(context, feature):
+    """Start tracing the feature and creating booking fixtures for its Background booking"""
+    if context.step_tracer is not None:
+        context.step_tracer.begin(feature)
+    if context.booking_pool is None or "api" not in feature.tags or feature.background is None:
+        return
+    for step in feature.background.steps:
+        if step.name == BOOKING_DETAILS_STEP and step.table:
+            context.booking_pool.prime(booking_details_from_row(step.table[0]))
+
+
+def after_feature(context, feature):
+    """Record the feature's trace event"""
+    if context.step_tracer is not None:
+        context.step_tracer.end(feature, f"Feature: {feature.name}", "feature",
+                                location=str(feature.location), status=feature.status.name)
 
 
 def before_scenario(context, scenario):
     """Setup chrome browser if running UI tests"""
+    if context.step_tracer is not None:
+        context.step_tracer.begin(scenario)
+    if context.http.cassette is not None:
+        # Replay prefers the scenario's own recordings, so order between scenarios doesn't matter
+        context.http.cassette.scope(scenario.name)
     if "ui" in scenario.effective_tags:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
-
-        # Set Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Enable headless mode
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--no-proxy-server")
-        
-        # Disable password save popup and leak detection
-        prefs = {
-            "credentials_enable_service": False,
-            "profile.password_manager_enabled": False,
-            "profile.password_manager_leak_detection": False
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-
-        try:
-            # Try to use webdriver_manager
-            from webdriver_manager.chrome import ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-        except ImportError:
-            # Fallback to local ChromeDriver path
-            service = Service(
-                "C:/Program Files/Google/Chrome/Driver/chromedriver.exe"
-            )
-
-        context.browser = webdriver.Chrome(
-            service=service, options=chrome_options
-        )
-        context.browser.maximize_window()
+        # Pooled browser, with WebDriver commands recorded for round-trip budgets
+        fresh = FRESH_BROWSER_TAG in scenario.effective_tags
+        context.browser = context.driver_commands.attach(context.browser_pool.acquire(fresh=fresh))
+        # Applied before the budget starts, so policy changes aren't charged to the scenario
+        context.network_policy.apply(context.browser, scenario.effective_tags)
+        context.driver_commands.start_scenario(scenario.name, scenario_budget(scenario.effective_tags))
+    if context.coverage_map is not None:
+        # Started last so the hooks' own code isn't attributed to the scenario
+        context.coverage_map.start()
 
 
 def after_scenario(context, scenario):
-    """Close chrome browser if running UI tests"""
+    """Return the chrome browser to the pool if running UI tests"""
+    if context.coverage_map is not None:
+        context.coverage_map.stop(scenario)
+    if context.http.cassette is not None:
+        context.http.cassette.scope(None)
     if "ui" in scenario.effective_tags and hasattr(context, "browser"):
-        context.browser.quit()
+        fresh = FRESH_BROWSER_TAG in scenario.effective_tags
+        context.driver_commands.end_scenario()
+        context.browser_pool.release(context.browser, discard=fresh)
+    if context.step_tracer is not None:
+        context.step_tracer.end(scenario, f"Scenario: {scenario.name}", "scenario",
+                                location=str(scenario.location), status=scenario.status.name)
+
+
+def before_step(context, step):
+    """Start timing the step"""
+    if context.step_tracer is not None:
+        context.step_tracer.begin(step)
+
+
+def after_step(context, step):
+    """Record the step's trace event, with Background steps in their own category"""
+    if context.step_tracer is not None:
+        background_steps = context.scenario.background_steps
+        in_background = any(background_step is step for background_step in background_steps)
+        context.step_tracer.end(step, f"{step.keyword} {step.name}",
+                                "background" if in_background else step.step_type,
+                                location=str(step.location), status=step.status.name)
+
+
+def after_all(context):
+    """Close the run's browsers, clients and pools and write its reports"""
+    context.browser_pool.close()
+    context.driver_commands.close()
+    context.session_cache.close()
+    context.http.close()
+    if context.booking_pool is not None:
+        context.booking_pool.close()
+    if hasattr(context, "booker_stub"):
+        context.booker_stub.stop()
+    if context.step_tracer is not None:
+        context.step_tracer.write()
+    if context.coverage_map is not None:
+        context.coverage_map.write()
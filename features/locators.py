@@ -1,5 +1,86 @@
 """Locators for UI tests"""
 
+import re
+from typing import NamedTuple, Union
+
+from selenium.webdriver.common.by import By
+
+# One condition inside a simple XPath predicate: @attr='value' or contains(@attr, 'value')
+_XPATH_CONDITION = re.compile(
+    r"\s*(?:@(?P<attr>[\w-]+)\s*=\s*(?P<q1>['\"])(?P<value>.*?)(?P=q1)"
+    r"|contains\(\s*@(?P<cattr>[\w-]+)\s*,\s*(?P<q2>['\"])(?P<cvalue>.*?)(?P=q2)\s*\))\s*"
+)
+_SIMPLE_XPATH = re.compile(r"^//(?P<tag>\*|[A-Za-z][\w-]*)\[(?P<predicate>.+)\]$")
+
+
+class Locator(NamedTuple):
+    """A (strategy, value) pair usable anywhere Selenium takes a locator tuple"""
+
+    by: str
+    value: str
+
+    @classmethod
+    def id(cls, element_id: str) -> "Locator":
+        return cls(By.ID, element_id)
+
+    @classmethod
+    def css(cls, selector: str) -> "Locator":
+        return cls(By.CSS_SELECTOR, selector)
+
+    @classmethod
+    def xpath(cls, expression: str) -> "Locator":
+        return cls(By.XPATH, expression)
+
+    @classmethod
+    def data_test(cls, value: str, tag: str = "") -> "Locator":
+        """Element with a data-test attribute, located by CSS"""
+        return cls.css(f"{tag}[data-test={_css_string(value)}]")
+
+    @classmethod
+    def from_xpath(cls, expression: str) -> "Locator":
+        """Translate a simple XPath to an ID or CSS locator, or keep it as XPath.
+
+        Handles //tag[...] with @attr='value' and contains(@attr, 'value')
+        conditions joined by "and"; anything else (text(), axes, positions)
+        stays XPath.
+        """
+        match = _SIMPLE_XPATH.match(expression.strip())
+        if not match:
+            return cls.xpath(expression)
+        conditions = []
+        for part in re.split(r"\s+and\s+", match.group("predicate")):
+            condition = _XPATH_CONDITION.fullmatch(part)
+            if not condition:
+                return cls.xpath(expression)
+            conditions.append(condition)
+
+        if len(conditions) == 1 and conditions[0].group("attr") == "id":
+            return cls.id(conditions[0].group("value"))
+
+        tag = "" if match.group("tag") == "*" else match.group("tag")
+        selector = tag
+        for condition in conditions:
+            if condition.group("attr"):
+                selector += f"[{condition.group('attr')}={_css_string(condition.group('value'))}]"
+            else:
+                selector += f"[{condition.group('cattr')}*={_css_string(condition.group('cvalue'))}]"
+        return cls.css(selector)
+
+
+LocatorLike = Union[str, Locator]
+
+
+def as_locator(locator: LocatorLike) -> Locator:
+    """Locator objects pass through; plain strings are XPaths, translated where possible"""
+    if isinstance(locator, Locator):
+        return locator
+    return Locator.from_xpath(locator)
+
+
+def _css_string(value: str) -> str:
+    """Double-quoted CSS string literal"""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
 
 class Locators:
     """Class stores all the locators for the application"""
@@ -7,62 +88,61 @@ class Locators:
     # Static methods for dynamic locators
     @staticmethod
     def cart_item(product_name):
-        return f"//div[text()='{product_name}']"
+        # Matched by text, which CSS can't express
+        return Locator.xpath(f"//div[text()='{product_name}']")
 
     @staticmethod
     def add_to_cart_button(product_name):
-        return (
-            f"//button[contains(@id, 'add-to-cart-"
-            f"{product_name.lower().replace(' ', '-')}')]"
-        )
+        return Locator.id(f"add-to-cart-{product_name.lower().replace(' ', '-')}")
 
     # Login Locators
-    LOGIN_BUTTON = "//input[@id='login-button']"
-    USERNAME_FIELD = "//input[@id='user-name']"
-    PASSWORD_FIELD = "//input[@id='password']"
+    LOGIN_BUTTON = Locator.id("login-button")
+    USERNAME_FIELD = Locator.id("user-name")
+    PASSWORD_FIELD = Locator.id("password")
 
     # Page Locators
-    PRODUCT_PAGE = "//span[@class='title' and text()='Products']"
-    CHECKOUT_PAGE = "//span[@class='title' and text()='Checkout: Your Information']"
-    CART_PAGE_TITLE = "//span[@data-test='title' and text()='Your Cart']"
-    CHECKOUT_OVERVIEW = "//span[@class='title' and text()='Checkout: Overview']"
-    CHECKOUT_COMPLETE = "//span[@class='title' and text()='Checkout: Complete!']"
+    PRODUCT_PAGE = Locator.xpath("//span[@class='title' and text()='Products']")
+    CHECKOUT_PAGE = Locator.xpath("//span[@class='title' and text()='Checkout: Your Information']")
+    CART_PAGE_TITLE = Locator.xpath("//span[@data-test='title' and text()='Your Cart']")
+    CHECKOUT_OVERVIEW = Locator.xpath("//span[@class='title' and text()='Checkout: Overview']")
+    CHECKOUT_COMPLETE = Locator.xpath("//span[@class='title' and text()='Checkout: Complete!']")
+    INVENTORY_CONTAINER = Locator.id("inventory_container")
 
     # Checkout Flow Locators
-    FIRST_NAME = "//input[@id='first-name']"
-    LAST_NAME = "//input[@id='last-name']"
-    POSTAL_CODE = "//input[@id='postal-code']"
-    CHECKOUT_BUTTON = "//button[@id='checkout']"
+    FIRST_NAME = Locator.id("first-name")
+    LAST_NAME = Locator.id("last-name")
+    POSTAL_CODE = Locator.id("postal-code")
+    CHECKOUT_BUTTON = Locator.id("checkout")
 
-    # CART_REMOVE = "//button[@id='remove-sauce-labs-backpack']" # not used
-    FINISH_BUTTON = "//button[@id='finish']"
+    # CART_REMOVE = Locator.id("remove-sauce-labs-backpack") # not used
+    FINISH_BUTTON = Locator.id("finish")
 
     # Product Page Locators
-    # PRODUCT_SORT_DROPDOWN = "//select[@class='product_sort_container']"
-    # BACK_TO_PRODUCTS = "//button[@id='back-to-products']" # not used
-    # PRODUCT_REMOVE = "//button[@id='remove']" # not used
+    # PRODUCT_SORT_DROPDOWN = Locator.css("select.product_sort_container")
+    # BACK_TO_PRODUCTS = Locator.id("back-to-products") # not used
+    # PRODUCT_REMOVE = Locator.id("remove") # not used
 
     # Nav Locators
-    CART_ICON = "//a[@data-test='shopping-cart-link']"
-    # BACK_HOME = "//button[@id='back-to-products']" # not used
-    # CANCEL_BUTTON = "//button[@id='cancel']" # not used
-    CONTINUE_BUTTON = "//input[@id='continue']"
-    # CON_SHOPPING_BUTTON = "//button[@id='continue-shopping']" # not used
-    REACT_BURGER = "//button[@id='react-burger-menu-btn']"
+    CART_ICON = Locator.data_test("shopping-cart-link", tag="a")
+    # BACK_HOME = Locator.id("back-to-products") # not used
+    # CANCEL_BUTTON = Locator.id("cancel") # not used
+    CONTINUE_BUTTON = Locator.id("continue")
+    # CON_SHOPPING_BUTTON = Locator.id("continue-shopping") # not used
+    REACT_BURGER = Locator.id("react-burger-menu-btn")
 
     # ERROR_MESSAGES - Using data-test="error" attribute for better reliability
-    UN_PW_ERROR = "//h3[@data-test='error' and contains(text(),'Epic sadface: Username and password do not match any user in this service')]"
-    LOCKED_OUT_ERROR = "//h3[@data-test='error' and contains(text(),'Epic sadface: Sorry, this user has been locked out.')]"
-    USERNAME_REQUIRED_ERROR = "//h3[@data-test='error' and contains(text(),'Epic sadface: Username is required')]"
-    PASSWORD_REQUIRED_ERROR = "//h3[@data-test='error' and contains(text(),'Epic sadface: Password is required')]"
-    
+    UN_PW_ERROR = Locator.xpath("//h3[@data-test='error' and contains(text(),'Epic sadface: Username and password do not match any user in this service')]")
+    LOCKED_OUT_ERROR = Locator.xpath("//h3[@data-test='error' and contains(text(),'Epic sadface: Sorry, this user has been locked out.')]")
+    USERNAME_REQUIRED_ERROR = Locator.xpath("//h3[@data-test='error' and contains(text(),'Epic sadface: Username is required')]")
+    PASSWORD_REQUIRED_ERROR = Locator.xpath("//h3[@data-test='error' and contains(text(),'Epic sadface: Password is required')]")
+
     # Generic error message container - using h3 with data-test="error"
-    ERROR_MESSAGE_CONTAINER = "//h3[@data-test='error']"
+    ERROR_MESSAGE_CONTAINER = Locator.data_test("error", tag="h3")
 
     # SIDEBAR_LINKS
-    LOGOUT = "//a[@id='logout_sidebar_link']"
-    # ALL_ITEMS = "//a[@id='inventory_sidebar_link']" # not implemented
-    # ABOUT = "//a[@id='about_sidebar_link']" # not implemented
-    # RESET_APP_STATE = "//a[@id='reset_sidebar_link']" # not implemented
+    LOGOUT = Locator.id("logout_sidebar_link")
+    # ALL_ITEMS = Locator.id("inventory_sidebar_link") # not implemented
+    # ABOUT = Locator.id("about_sidebar_link") # not implemented
+    # RESET_APP_STATE = Locator.id("reset_sidebar_link") # not implemented
 
     # SOCIAL_LINKS
@@ -7,13 +7,18 @@ Feature: User Authentication
   Background:
     Given a user is on the login page
 
-  @smoke @positive
+  @smoke @positive @network:full
   Scenario: Successful login with valid credentials
     When the user enters "standard_user" and "secret_sauce"
     Then the user should be successfully logged in
     And the product page should be displayed
     And the product page should load in less than 1 second
 
+  @performance @page-timing
+  Scenario: Login page loads within its timing budget
+    Then the page "DOMContentLoaded" time should be less than 3000 ms
+    And the page "first contentful paint" time should be less than 3000 ms
+
   @smoke @negative
   Scenario: Failed login with invalid credentials
     When the user enters "standard_user" and "wrong_password"
@@ -70,3 +75,9 @@ Feature: User Authentication
       | locked_out_user    | secret_sauce  | not able to login | Epic sadface: Sorry, this user has been locked out.                        |
       | problem_user       | secret_sauce  | successfully logged in |                                                                        |
       | performance_glitch_user | secret_sauce | successfully logged in |                                                                    |
+
+  @data-driven @sharded @credentials
+  Scenario: Login with credentials streamed from a data file
+    Given login credentials are streamed from "logins.csv"
+    When each streamed user logs in
+    Then every streamed login should have the expected result
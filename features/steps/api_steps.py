@@ -2,11 +2,8 @@
 Step definitions for 'api.feature' - Hotel Booking Management
 """
 
-import os
 import json
-
-import jsonschema
-import requests
+import logging
 
 # pylint: disable=no-name-in-module
 from behave import given, then, when
@@ -14,9 +11,18 @@ from behave import given, then, when
 # pylint: enable=no-name-in-module
 from dateutil.parser import parse
 
-from utils.schema_loader import load_schema
+from utils.booking_payloads import (
+    booking_details_from_row,
+    booking_request_body,
+    partial_update_from_row,
+)
+from utils.data_sources import DataSource, RowResults
+from utils.http_client import HttpClient
+from utils.load_runner import burst, percentile, record_burst
+
+# behave execs step modules, so __name__ would be "builtins"
+logger = logging.getLogger("features.steps.api_steps")
 
-BASE_URL = os.getenv("BASE_URL", "http://localhost:3001/")
 BOOKING_ENDPOINT = "booking"
 AUTH_ENDPOINT = "auth"
 
@@ -34,6 +40,11 @@ headers_with_cookie = {
 }
 
 
+def auth_headers(token):
+    """Copy of headers_with_cookie carrying the given auth token"""
+    return {**headers_with_cookie, "Cookie": f"token={token}"}
+
+
 # ============================================================================
 # GIVEN STEPS - Setup and Context
 # ============================================================================
@@ -50,23 +61,22 @@ def step_have_valid_credentials(context):
 def step_have_booking_details(context):
     """Store booking details from data table for later use"""
     booking_data = context.table[0]  # Get first row from table
-    context.booking_details = {
-        "firstname": booking_data["firstname"],
-        "lastname": booking_data["lastname"],
-        "totalprice": int(booking_data["totalprice"]),
-        "depositpaid": booking_data["depositpaid"].lower() == "true",
-        "checkin": booking_data["checkin"],
-        "checkout": booking_data["checkout"],
-        "additionalneeds": booking_data["additionalneeds"] if booking_data["additionalneeds"] not in ["None", "null", ""] else None
-    }
+    context.booking_details = booking_details_from_row(booking_data)
 
 
 @given("a booking has been created")
 def step_booking_exists(context):
-    """Ensure a booking exists by creating one if it doesn't"""
+    """Ensure a booking exists, taking one from the fixture pool or creating it"""
     if not hasattr(context, 'bookingid') or context.bookingid is None:
-        # Create a booking if one doesn't exist
-        step_create_booking_internal(context)
+        fixture = None
+        if context.booking_pool is not None:
+            fixture = context.booking_pool.acquire(context.booking_details)
+        
+        if fixture is not None:
+            context.bookingid, context.booking = fixture
+        else:
+            # Create a booking if the pool has none ready
+            step_create_booking_internal(context)
     
     # Ensure we have a valid booking ID
     assert context.bookingid is not None, "Booking should have been created"
@@ -76,35 +86,14 @@ def step_booking_exists(context):
 def step_have_updated_details(context):
     """Store updated booking details from data table"""
     booking_data = context.table[0]
-    context.updated_details = {
-        "firstname": booking_data["firstname"],
-        "lastname": booking_data["lastname"],
-        "totalprice": int(booking_data["totalprice"]),
-        "depositpaid": booking_data["depositpaid"].lower() == "true",
-        "checkin": booking_data["checkin"],
-        "checkout": booking_data["checkout"],
-        "additionalneeds": booking_data["additionalneeds"] if booking_data["additionalneeds"] not in ["None", "null", ""] else None
-    }
+    context.updated_details = booking_details_from_row(booking_data)
 
 
 @given("I want to update specific booking details")
 def step_have_partial_update_details(context):
     """Store partial update details from data table"""
     booking_data = context.table[0]
-    context.partial_update = {}
-    
-    if "totalprice" in booking_data:
-        context.partial_update["totalprice"] = int(booking_data["totalprice"])
-    if "depositpaid" in booking_data:
-        context.partial_update["depositpaid"] = booking_data["depositpaid"].lower() == "true"
-    if "checkin" in booking_data:
-        if "bookingdates" not in context.partial_update:
-            context.partial_update["bookingdates"] = {}
-        context.partial_update["bookingdates"]["checkin"] = booking_data["checkin"]
-    if "checkout" in booking_data:
-        if "bookingdates" not in context.partial_update:
-            context.partial_update["bookingdates"] = {}
-        context.partial_update["bookingdates"]["checkout"] = booking_data["checkout"]
+    context.partial_update = partial_update_from_row(booking_data)
 
 
 @given("I have an invalid booking reference")
@@ -123,15 +112,13 @@ def step_no_authorization(context):
 def step_have_invalid_booking_dates(context):
     """Store booking details with invalid dates from data table"""
     booking_data = context.table[0]  # Get first row from table
-    context.booking_details = {
-        "firstname": booking_data["firstname"],
-        "lastname": booking_data["lastname"],
-        "totalprice": int(booking_data["totalprice"]),
-        "depositpaid": booking_data["depositpaid"].lower() == "true",
-        "checkin": booking_data["checkin"],
-        "checkout": booking_data["checkout"],
-        "additionalneeds": booking_data["additionalneeds"] if booking_data["additionalneeds"] not in ["None", "null", ""] else None
-    }
+    context.booking_details = booking_details_from_row(booking_data)
+
+
+@given('booking details are streamed from "{name}"')
+def step_stream_booking_details(context, name):
+    """Open a CSV or JSONL file of booking rows; rows are read only as they are used"""
+    context.data_source = DataSource.from_env(name, context.scenario.effective_tags)
 
 
 # ============================================================================
@@ -147,8 +134,8 @@ def step_create_booking(context):
 @when("I request the booking details")
 def step_request_booking_details(context):
     """Retrieve booking details by ID"""
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}/{context.bookingid}"
-    context.response = requests.get(url, headers=headers, timeout=5)
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
+    context.response = context.http.get(url, headers=headers)
     
     # Debug logging for CI
     print(f"DEBUG: Requesting booking ID: {context.bookingid}")
@@ -159,93 +146,91 @@ def step_request_booking_details(context):
         context.booking = context.response.json()
 
 
+@when("I request the booking details {count:d} times with {clients:d} concurrent clients")
+def step_request_booking_details_burst(context, count, clients):
+    """Retrieve the booking from concurrent clients and record the latencies"""
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
+    run_latency_burst(context, "GET /booking/{id}", count, clients,
+                      lambda http: http.get(url, headers=headers).status_code == 200)
+
+
+@when("I update the booking {count:d} times with {clients:d} concurrent clients")
+def step_update_booking_burst(context, count, clients):
+    """Update the booking from concurrent clients and record the latencies"""
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
+    update_data = booking_request_body(context.updated_details)
+    step_get_auth_token(context)
+    run_latency_burst(context, "PUT /booking/{id}", count, clients,
+                      lambda http: http.put(url, headers=auth_headers(context.token), json=update_data).status_code == 200)
+
+
 @when("I update the booking")
 def step_update_booking(context):
     """Update booking with complete information"""
-    # Get authentication token first
-    if not context.token:
-        step_get_auth_token(context)
-    
-    headers_with_cookie["Cookie"] = f"token={context.token}"
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}/{context.bookingid}"
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
     
     # Use updated details from context
-    update_data = context.updated_details.copy()
-    update_data["bookingdates"] = {
-        "checkin": update_data.pop("checkin"),
-        "checkout": update_data.pop("checkout")
-    }
+    update_data = booking_request_body(context.updated_details)
     
-    context.response = requests.put(
-        url,
-        headers=headers_with_cookie,
-        json=update_data,
-        timeout=5,
-    )
+    context.response = send_authenticated(context, "PUT", url, json=update_data)
 
 
 @when("I partially update the booking")
 def step_partial_update_booking(context):
     """Partially update booking information"""
-    # Get authentication token first
-    if not context.token:
-        step_get_auth_token(context)
-    
-    headers_with_cookie["Cookie"] = f"token={context.token}"
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}/{context.bookingid}"
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
     
-    context.response = requests.patch(
-        url,
-        headers=headers_with_cookie,
-        json=context.partial_update,
-        timeout=5,
-    )
+    context.response = send_authenticated(context, "PATCH", url, json=context.partial_update)
 
 
 @when("I cancel the booking")
 def step_cancel_booking(context):
     """Cancel/delete a hotel booking"""
-    # Get authentication token first
-    if not context.token:
-        step_get_auth_token(context)
-    
-    headers_with_cookie["Cookie"] = f"token={context.token}"
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}/{context.bookingid}"
-    context.response = requests.delete(
-        url, headers=headers_with_cookie, timeout=5
-    )
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
+    context.response = send_authenticated(context, "DELETE", url)
 
 
 @when("I attempt to update the booking")
 def step_attempt_update_booking(context):
     """Attempt to update booking without proper authorization"""
-    # Use invalid or no token
-    headers_with_cookie["Cookie"] = f"token={context.token or 'invalid'}"
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}/{context.bookingid}"
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
     
     # Use the updated details if available, otherwise use original booking details
     if hasattr(context, 'updated_details') and context.updated_details:
-        update_data = context.updated_details.copy()
-        update_data["bookingdates"] = {
-            "checkin": update_data.pop("checkin"),
-            "checkout": update_data.pop("checkout")
-        }
+        update_data = booking_request_body(context.updated_details)
     else:
         # Fallback to original booking details
-        update_data = context.booking_details.copy()
-        update_data["bookingdates"] = {
-            "checkin": update_data.pop("checkin"),
-            "checkout": update_data.pop("checkout")
-        }
+        update_data = booking_request_body(context.booking_details)
     
-    context.response = requests.put(
+    # Use invalid or no token
+    context.response = context.http.put(
         url,
-        headers=headers_with_cookie,
+        headers=auth_headers(context.token or "invalid"),
         json=update_data,
-        timeout=5,
     )
 
 
+@when("I create a booking for each streamed row")
+def step_create_streamed_bookings(context):
+    """Create one booking per streamed row, keeping only pass/fail counts"""
+    context.row_results = RowResults(context.data_source)
+    url = f"{context.base_url}{BOOKING_ENDPOINT}"
+    for number, row in context.data_source:
+        try:
+            booking_data = booking_request_body(booking_details_from_row(row))
+        except (KeyError, ValueError, AttributeError) as error:
+            context.row_results.record(number, f"invalid row {row}: {error!r}")
+            continue
+        
+        response = context.http.post(url, headers=headers, json=booking_data)
+        if response.status_code != 200:
+            context.row_results.record(number, f"expected 200, got {response.status_code}: {response.text}")
+            continue
+        booking = response.json().get("booking", {})
+        mismatched = [field for field in ("firstname", "lastname", "totalprice") if booking.get(field) != booking_data[field]]
+        context.row_results.record(number, f"booking differs in {mismatched}: {booking}" if mismatched else None)
+
+
 # ============================================================================
 # THEN STEPS - Assertions and Validations
 # ============================================================================
@@ -257,6 +242,12 @@ def step_booking_created_successfully(context):
     assert context.bookingid is not None, "Booking ID should be generated"
 
 
+@then("every streamed booking should be created with its details")
+def step_streamed_bookings_created(context):
+    """Verify that every streamed row produced a matching booking"""
+    context.row_results.assert_all_passed()
+
+
 @then("I should receive a booking confirmation")
 def step_receive_booking_confirmation(context):
     """Verify that a booking confirmation is received"""
@@ -277,9 +268,8 @@ def step_booking_data_valid(context):
     """Verify that booking data is valid according to schema"""
     assert context.response.status_code == 200
 
-    # Load and validate against schema
-    schema = load_schema("booking_schema.json")
-    jsonschema.validate(context.response.json(), schema)
+    # Validate against the schema compiled in before_all
+    context.schemas.validate("booking_schema.json", context.response.json())
 
 
 @then("the booking should be updated successfully")
@@ -310,11 +300,30 @@ def step_booking_cancelled_successfully(context):
 def step_booking_no_longer_accessible(context):
     """Verify that the cancelled booking is no longer accessible"""
     # Try to retrieve the cancelled booking
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}/{context.bookingid}"
-    response = requests.get(url, headers=headers, timeout=5)
+    url = f"{context.base_url}{BOOKING_ENDPOINT}/{context.bookingid}"
+    response = context.http.get(url, headers=headers)
     assert response.status_code == 404, "Cancelled booking should return 404"
 
 
+@then("all requests should succeed")
+def step_all_requests_succeed(context):
+    """Verify that no request in the burst failed"""
+    latency = context.latency
+    assert latency["errors"] == 0, f"{latency['errors']} of {latency['requests']} {latency['endpoint']} requests failed"
+
+
+@then("the p{pct:d} latency should be below {limit:d} ms")
+def step_latency_percentile_below(context, pct, limit):
+    """Verify a latency percentile of the last burst"""
+    latency = context.latency
+    value = percentile(latency["samples_ms"], pct)
+    assert value is not None, "No latency samples recorded"
+    assert value < limit, (
+        f"p{pct} latency of {latency['endpoint']} was {value:.1f} ms, expected below {limit} ms; "
+        f"histogram: {latency['histogram']}"
+    )
+
+
 @then("I should receive a not found error")
 def step_receive_not_found_error(context):
     """Verify that a not found error is returned"""
@@ -345,19 +354,14 @@ def step_create_booking_internal(context):
     step_get_auth_token(context)
     
     # Prepare booking data
-    booking_data = context.booking_details.copy()
-    booking_data["bookingdates"] = {
-        "checkin": booking_data.pop("checkin"),
-        "checkout": booking_data.pop("checkout")
-    }
+    booking_data = booking_request_body(context.booking_details)
     
     # Create the booking
-    url = f"{BASE_URL}{BOOKING_ENDPOINT}"
-    context.response = requests.post(
+    url = f"{context.base_url}{BOOKING_ENDPOINT}"
+    context.response = context.http.post(
         url,
         headers=headers,
         json=booking_data,
-        timeout=5,
     )
     
     # Store response data
@@ -367,17 +371,56 @@ def step_create_booking_internal(context):
         context.booking = response_data["booking"]
 
 
+def run_latency_burst(context, endpoint, count, clients, send):
+    """Send a request burst over a dedicated client with one connection per concurrent client"""
+    # Shares the run's cassette, so bursts are recorded and replayed with the other requests
+    http = HttpClient(pool_size=clients, retries=0, timeout=context.http.timeout, cassette=context.http.cassette)
+    try:
+        context.latency = burst(lambda: send(http), count, clients)
+    finally:
+        # Only the connections: the run's client saves the shared cassette in after_all
+        http.session.close()
+    # Kept apart from the run's client, whose counters describe its own connection reuse
+    context.burst_requests["sent"] += count
+    context.latency["endpoint"] = endpoint
+
+    summary = {key: value for key, value in context.latency.items() if key != "samples_ms"}
+    record_burst({"scenario": context.scenario.name, **summary})
+    logger.info("%s x%d with %d clients: p50 %.1f ms, p95 %.1f ms, p99 %.1f ms, %d errors",
+                endpoint, count, clients, summary["p50_ms"], summary["p95_ms"], summary["p99_ms"], summary["errors"])
+
+
 def step_get_auth_token(context):
-    """Helper function to get authentication token"""
-    auth_response = requests.post(
-        f"{BASE_URL}{AUTH_ENDPOINT}",
+    """Helper function to get authentication token, cached per target and user"""
+    context.token = context.token_cache.get_or_fetch(
+        context.base_url, context.username, lambda: request_auth_token(context)
+    )
+
+
+def request_auth_token(context):
+    """POST the credentials to the auth endpoint and return the new token"""
+    auth_response = context.http.post(
+        f"{context.base_url}{AUTH_ENDPOINT}",
         headers=headers,
         json={"username": context.username, "password": context.password},
-        timeout=5,
     )
     
     if auth_response.status_code == 200:
-        context.token = auth_response.json()["token"]
-        assert context.token != "", "Authentication token should not be empty"
-    else:
-        raise AssertionError(f"Authentication failed: {auth_response.status_code} - {auth_response.text}")
+        token = auth_response.json()["token"]
+        assert token != "", "Authentication token should not be empty"
+        return token
+    raise AssertionError(f"Authentication failed: {auth_response.status_code} - {auth_response.text}")
+
+
+def send_authenticated(context, method, url, **kwargs):
+    """Send a request with the auth token, refreshing it once if rejected with 403"""
+    if not context.token:
+        step_get_auth_token(context)
+    
+    response = context.http.request(method, url, headers=auth_headers(context.token), **kwargs)
+    if response.status_code == 403:
+        # The cached token may have expired on the server
+        context.token_cache.invalidate(context.base_url, context.username)
+        step_get_auth_token(context)
+        response = context.http.request(method, url, headers=auth_headers(context.token), **kwargs)
+    return response
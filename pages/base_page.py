@@ -3,55 +3,310 @@ Base Page Object Model class
 """
 
 import logging
-from typing import Optional
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
+import os
+from typing import Iterable, List, Optional, Tuple
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from features.locators import Locator, LocatorLike, as_locator
+from utils.driver_commands import budget_exempt
+
 logging.basicConfig(level=logging.INFO)
 
+# Resolves a locator passed from Python, a [strategy, value] pair, to the
+# first matching element with the browser's native lookup for its strategy
+RESOLVE_LOCATOR_JS = """
+const resolveLocator = ([by, value]) => {
+    if (by === 'id') return document.getElementById(value);
+    if (by === 'css selector') return document.querySelector(value);
+    return document.evaluate(
+        value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+};
+"""
+
+# performance.mark names used to time user actions inside the browser
+ACTION_MARK = "behave-action"
+READY_MARK = "behave-ready"
+
+# Marks the start of an action and, if a ready locator is given, watches the
+# DOM so the ready mark lands when that element first becomes visible, no
+# matter how much later the harness gets around to checking for it.
+WATCH_READY_JS = RESOLVE_LOCATOR_JS + """
+const watchReady = (readyLocator) => {
+    performance.clearMarks('%(ready)s');
+    performance.mark('%(action)s');
+    if (!readyLocator) return;
+    const isReady = () => {
+        const element = resolveLocator(readyLocator);
+        return element && element.getClientRects().length > 0;
+    };
+    const observer = new MutationObserver(() => {
+        if (isReady()) {
+            performance.mark('%(ready)s');
+            observer.disconnect();
+        }
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true});
+    setTimeout(() => observer.disconnect(), 30000);
+};
+""" % {"action": ACTION_MARK, "ready": READY_MARK}
+
+MARK_ACTION_SCRIPT = WATCH_READY_JS + "watchReady(arguments[0]);"
+
+# Fills inputs through the native value setter so React's change tracking
+# sees the new value, then fires input/change events and clicks the submit
+# element. Returns the first locator that could not be found, or null.
+FILL_FORM_SCRIPT = WATCH_READY_JS + """
+const [fills, submitLocator, readyLocator] = arguments;
+const targets = fills.map(([locator]) => resolveLocator(locator));
+const submit = submitLocator ? resolveLocator(submitLocator) : null;
+const missing = fills.findIndex((fill, index) => !targets[index]);
+if (missing >= 0) return fills[missing][0];
+if (submitLocator && !submit) return submitLocator;
+targets.forEach((element, index) => {
+    const proto = element instanceof HTMLTextAreaElement
+        ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    element.focus();
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(element, fills[index][1]);
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    element.blur();
+});
+if (submit) {
+    watchReady(readyLocator);
+    submit.click();
+}
+return null;
+"""
+
+# Resolves with the element as soon as it is in the DOM (and visible, if
+# asked), watching DOM mutations with a poll as a safety net, or with null
+# once the timeout expires.
+WAIT_FOR_ELEMENT_SCRIPT = RESOLVE_LOCATOR_JS + """
+const [locator, visible, timeoutMs, pollMs] = arguments;
+const done = arguments[arguments.length - 1];
+const find = () => {
+    const element = resolveLocator(locator);
+    if (!element || !visible) return element;
+    const shown = element.getClientRects().length > 0
+        && window.getComputedStyle(element).visibility !== 'hidden';
+    return shown ? element : null;
+};
+const found = find();
+if (found) return done(found);
+let observer, poll, timer;
+const finish = (element) => {
+    observer.disconnect();
+    clearInterval(poll);
+    clearTimeout(timer);
+    done(element);
+};
+const check = () => { const element = find(); if (element) finish(element); };
+observer = new MutationObserver(check);
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+poll = setInterval(check, pollMs);
+timer = setTimeout(() => finish(null), timeoutMs);
+"""
+
+# Presence, visibility and visible text of each locator, in order, plus the
+# URL and title, so a page can be verified from one script call
+PAGE_SNAPSHOT_JS = RESOLVE_LOCATOR_JS + """
+const takeSnapshot = (locators) => {
+    const elements = locators.map((locator) => {
+        const element = resolveLocator(locator);
+        const visible = !!element && element.getClientRects().length > 0
+            && window.getComputedStyle(element).visibility !== 'hidden';
+        return {present: !!element, visible: visible, text: visible ? element.innerText.trim() : null};
+    });
+    return {url: window.location.href, title: document.title, elements: elements};
+};
+"""
+
+PAGE_SNAPSHOT_SCRIPT = PAGE_SNAPSHOT_JS + "return takeSnapshot(arguments[0]);"
+
+# Resolves with a snapshot as soon as the required locators (indexes into
+# locators) are present and
+# the URL contains the fragment, or with the latest one at the timeout
+WAIT_FOR_SNAPSHOT_SCRIPT = PAGE_SNAPSHOT_JS + """
+const [locators, required, urlFragment, timeoutMs, pollMs] = arguments;
+const done = arguments[arguments.length - 1];
+const isReady = (snapshot) => required.every((index) => snapshot.elements[index].present)
+    && (!urlFragment || snapshot.url.toLowerCase().includes(urlFragment.toLowerCase()));
+const first = takeSnapshot(locators);
+if (isReady(first)) { first.ready = true; return done(first); }
+let observer, poll, timer;
+const finish = (snapshot, ready) => {
+    observer.disconnect();
+    clearInterval(poll);
+    clearTimeout(timer);
+    snapshot.ready = ready;
+    done(snapshot);
+};
+const check = () => { const snapshot = takeSnapshot(locators); if (isReady(snapshot)) finish(snapshot, true); };
+observer = new MutationObserver(check);
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+poll = setInterval(check, pollMs);
+timer = setTimeout(() => finish(takeSnapshot(locators), false), timeoutMs);
+"""
+
+# Navigation Timing and Paint Timing entries for the current document, plus
+# the in-browser time from the last action mark to the last ready mark, which
+# covers client-side route changes that don't create a new navigation entry.
+# document_url is the URL the document was loaded from; it differs from url
+# after a client-side route change, when the document phases describe an
+# earlier page
+PAGE_METRICS_SCRIPT = """
+const [actionMark, readyMark] = arguments;
+const nav = performance.getEntriesByType('navigation')[0];
+const paint = {};
+performance.getEntriesByType('paint').forEach((entry) => { paint[entry.name] = entry.startTime; });
+const action = performance.getEntriesByName(actionMark).pop();
+const ready = performance.getEntriesByName(readyMark).pop();
+return {
+    url: window.location.href,
+    document_url: nav ? nav.name : null,
+    navigation_type: nav ? nav.type : null,
+    time_to_first_byte: nav ? nav.responseStart : null,
+    dom_interactive: nav ? nav.domInteractive : null,
+    dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+    load_event: nav ? nav.loadEventEnd : null,
+    first_paint: paint['first-paint'] ?? null,
+    first_contentful_paint: paint['first-contentful-paint'] ?? null,
+    action_to_ready: action && ready && ready.startTime >= action.startTime
+        ? ready.startTime - action.startTime : null,
+};
+"""
+
+# Fallback polling interval (seconds) for the mutation-observer wait and the
+# WebDriverWait path used when async scripts can't run
+DEFAULT_POLL_INTERVAL = float(os.getenv("WAIT_POLL_INTERVAL", "0.1"))
+
+# Selenium's default async script timeout; waits are capped just below it
+ASYNC_SCRIPT_TIMEOUT = 30
+
+# WebDriver calls made by the per-element path: find, clear and send_keys per
+# field, find, is_displayed and click for the submit element
+ROUND_TRIPS_PER_FILL = 3
+ROUND_TRIPS_PER_CLICK = 3
+
+# is_*_page_loaded checks: one page snapshot
+LOADED_CHECK_ROUND_TRIPS = 1
+
+# Counter on the driver bumped by every action and navigation made through a
+# page object; snapshots taken at an older count are stale
+PAGE_EPOCH_ATTRIBUTE = "_behave_page_epoch"
+
+
+def page_epoch(driver) -> int:
+    """Number of actions and navigations made through page objects on this driver"""
+    return getattr(driver, PAGE_EPOCH_ATTRIBUTE, 0)
+
+
+def invalidate_page_state(driver) -> None:
+    """Mark every cached page snapshot for this driver as stale"""
+    setattr(driver, PAGE_EPOCH_ATTRIBUTE, page_epoch(driver) + 1)
+
+
+class PageSnapshot:
+    """URL, title and element states of a page, captured in one script call"""
+
+    def __init__(self, locators: List[Locator], data: dict, epoch: int):
+        self.url = data.get("url", "")
+        self.title = data.get("title", "")
+        self.elements = dict(zip(locators, data.get("elements", [])))
+        self.ready = data.get("ready", False)
+        self.epoch = epoch
+
+    def covers(self, locators: Iterable[LocatorLike]) -> bool:
+        """Whether every locator was captured"""
+        return all(as_locator(locator) in self.elements for locator in locators)
+
+    def satisfies(self, required: Iterable[LocatorLike], url_contains: Optional[str] = None) -> bool:
+        """Whether the required locators are present and the URL contains the fragment"""
+        if url_contains and url_contains.lower() not in self.url.lower():
+            return False
+        return all(self.is_present(locator) for locator in required)
+
+    def is_present(self, locator: LocatorLike) -> bool:
+        return self.elements.get(as_locator(locator), {}).get("present", False)
+
+    def is_visible(self, locator: LocatorLike) -> bool:
+        return self.elements.get(as_locator(locator), {}).get("visible", False)
+
+    def text(self, locator: LocatorLike) -> Optional[str]:
+        """Visible text of the element, or None if it is missing or hidden"""
+        return self.elements.get(as_locator(locator), {}).get("text")
+
 
 class BasePage:
     """Base page class that all page objects inherit from"""
+
+    # Locators captured in every snapshot of this page
+    SNAPSHOT_LOCATORS: Tuple[LocatorLike, ...] = ()
     
     def __init__(self, driver):
         self.driver = driver
         self.wait = WebDriverWait(driver, 10)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.round_trips_saved = 0
+        self.poll_interval = DEFAULT_POLL_INTERVAL
+        self._snapshot = None
     
-    def find_element(self, locator: str, timeout: int = 10) -> Optional[object]:
-        """Find element with explicit wait"""
+    def wait_for_element(self, locator: LocatorLike, visible: bool = False,
+                         timeout: int = 10) -> Optional[object]:
+        """Wait for an element to be present (or visible) without fixed polling.
+
+        Runs a MutationObserver in the page through execute_async_script so the
+        wait ends as soon as the DOM changes. If the script can't run, e.g. the
+        page navigates mid-wait, falls back to WebDriverWait polling.
+        """
+        locator = as_locator(locator)
+        timeout_ms = int(min(timeout, ASYNC_SCRIPT_TIMEOUT - 1) * 1000)
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.XPATH, locator))
+            return self.driver.execute_async_script(
+                WAIT_FOR_ELEMENT_SCRIPT, locator, visible, timeout_ms,
+                int(self.poll_interval * 1000),
             )
-            return element
+        except WebDriverException as error:
+            self.logger.debug(f"Async wait unavailable, polling instead: {error}")
+
+        # Polls vary with timing, so they are not charged to round-trip budgets
+        condition = EC.visibility_of_element_located if visible else EC.presence_of_element_located
+        try:
+            with budget_exempt(self.driver):
+                return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(
+                    condition(locator)
+                )
         except TimeoutException:
-            self.logger.error(f"Element not found: {locator}")
             return None
     
-    def find_element_visible(self, locator: str, timeout: int = 10) -> Optional[object]:
+    def find_element(self, locator: LocatorLike, timeout: int = 10) -> Optional[object]:
+        """Find element with explicit wait"""
+        element = self.wait_for_element(locator, visible=False, timeout=timeout)
+        if element is None:
+            self.logger.error(f"Element not found: {locator}")
+        return element
+    
+    def find_element_visible(self, locator: LocatorLike, timeout: int = 10) -> Optional[object]:
         """Find visible element with explicit wait"""
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located((By.XPATH, locator))
-            )
-            return element
-        except TimeoutException:
+        element = self.wait_for_element(locator, visible=True, timeout=timeout)
+        if element is None:
             self.logger.error(f"Element not visible: {locator}")
-            return None
+        return element
     
-    def click_element(self, locator: str, timeout: int = 10) -> bool:
+    def click_element(self, locator: LocatorLike, timeout: int = 10) -> bool:
         """Click element with explicit wait"""
+        invalidate_page_state(self.driver)
         element = self.find_element_visible(locator, timeout)
         if element:
             element.click()
             return True
         return False
     
-    def enter_text(self, locator: str, text: str, timeout: int = 10) -> bool:
+    def enter_text(self, locator: LocatorLike, text: str, timeout: int = 10) -> bool:
         """Enter text into element with explicit wait"""
+        invalidate_page_state(self.driver)
         element = self.find_element(locator, timeout)
         if element:
             element.clear()
@@ -59,44 +314,145 @@ class BasePage:
             return True
         return False
     
-    def get_text(self, locator: str, timeout: int = 10) -> Optional[str]:
+    def fill_form(self, fills: List[Tuple[LocatorLike, str]], submit_locator: Optional[LocatorLike] = None,
+                  timeout: int = 10, ready_locator: Optional[LocatorLike] = None) -> bool:
+        """Fill several fields and optionally click submit in one WebDriver round trip.
+
+        Falls back to enter_text/click_element, which wait for each element,
+        if the script fails or an element is not in the DOM yet. If
+        ready_locator is given, the time from the click until it becomes
+        visible is recorded in the browser (see get_page_metrics).
+        """
+        invalidate_page_state(self.driver)
+        try:
+            missing = self.driver.execute_script(
+                FILL_FORM_SCRIPT,
+                [[as_locator(locator), value] for locator, value in fills],
+                as_locator(submit_locator) if submit_locator else None,
+                as_locator(ready_locator) if ready_locator else None,
+            )
+        except WebDriverException as error:
+            self.logger.warning(f"Batched form fill failed, filling per element: {error}")
+            missing = True
+
+        if missing is None:
+            saved = ROUND_TRIPS_PER_FILL * len(fills) + (ROUND_TRIPS_PER_CLICK if submit_locator else 0) - 1
+            self.round_trips_saved += saved
+            self.logger.info(f"Filled {len(fills)} fields in one round trip, saved {saved} round trips")
+            return True
+
+        if missing is not True:
+            self.logger.info(f"Element not ready for batched fill ({missing}), filling per element")
+        for locator, value in fills:
+            if not self.enter_text(locator, value, timeout):
+                self.logger.error(f"Failed to enter text into: {locator}")
+                return False
+        if submit_locator:
+            self.mark_action(ready_locator)
+            return self.click_element(submit_locator, timeout)
+        return True
+    
+    def get_text(self, locator: LocatorLike, timeout: int = 10) -> Optional[str]:
         """Get text from element with explicit wait"""
         element = self.find_element_visible(locator, timeout)
         if element:
             return element.text.strip()
         return None
     
-    def is_element_present(self, locator: str, timeout: int = 5) -> bool:
+    def is_element_present(self, locator: LocatorLike, timeout: int = 5) -> bool:
         """Check if element is present"""
         element = self.find_element(locator, timeout)
         return element is not None
     
-    def is_element_visible(self, locator: str, timeout: int = 5) -> bool:
+    def is_element_visible(self, locator: LocatorLike, timeout: int = 5) -> bool:
         """Check if element is visible"""
         element = self.find_element_visible(locator, timeout)
         return element is not None
     
+    def snapshot(self, required: Iterable[LocatorLike] = (), url_contains: Optional[str] = None,
+                 extra: Iterable[LocatorLike] = (), timeout: int = 5) -> PageSnapshot:
+        """URL, title and state of the page's SNAPSHOT_LOCATORS (plus required and extra) in one call.
+
+        Waits up to timeout for the required locators to be present and the
+        URL to contain url_contains. A snapshot that got there is cached until
+        the next action or navigation made through any page object.
+        """
+        required = [as_locator(locator) for locator in required]
+        locators = list(dict.fromkeys(
+            as_locator(locator) for locator in [*self.SNAPSHOT_LOCATORS, *required, *extra]
+        ))
+        cached = self._snapshot
+        if cached is not None and cached.epoch == page_epoch(self.driver) \
+                and cached.covers(locators) and cached.satisfies(required, url_contains):
+            return cached
+
+        epoch = page_epoch(self.driver)
+        timeout_ms = int(min(timeout, ASYNC_SCRIPT_TIMEOUT - 1) * 1000)
+        try:
+            data = self.driver.execute_async_script(
+                WAIT_FOR_SNAPSHOT_SCRIPT, locators, [locators.index(locator) for locator in required],
+                url_contains, timeout_ms,
+                int(self.poll_interval * 1000),
+            )
+        except WebDriverException as error:
+            self.logger.debug(f"Async snapshot unavailable, polling instead: {error}")
+            data = self._poll_snapshot(locators, required, url_contains, timeout)
+
+        snapshot = PageSnapshot(locators, data or {}, epoch)
+        self._snapshot = snapshot if snapshot.ready else None
+        return snapshot
+
+    def _poll_snapshot(self, locators: List[Locator], required: List[Locator],
+                       url_contains: Optional[str], timeout: int) -> dict:
+        latest = {}
+
+        def ready(driver):
+            latest["data"] = driver.execute_script(PAGE_SNAPSHOT_SCRIPT, locators)
+            return PageSnapshot(locators, latest["data"], 0).satisfies(required, url_contains)
+
+        try:
+            with budget_exempt(self.driver):
+                WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval,
+                              ignored_exceptions=(WebDriverException,)).until(ready)
+            return dict(latest["data"], ready=True)
+        except TimeoutException:
+            return dict(latest.get("data") or {}, ready=False)
+    
     def wait_for_url_contains(self, url_fragment: str, timeout: int = 10) -> bool:
         """Wait for URL to contain specific fragment"""
         try:
-            WebDriverWait(self.driver, timeout).until(
-                lambda driver: url_fragment in driver.current_url
-            )
+            with budget_exempt(self.driver):
+                WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(
+                    lambda driver: url_fragment in driver.current_url
+                )
             return True
         except TimeoutException:
             self.logger.error(f"URL did not contain '{url_fragment}' within {timeout}s")
             return False
     
+    def mark_action(self, ready_locator: Optional[LocatorLike] = None) -> None:
+        """Mark the start of an action and watch for ready_locator to become visible"""
+        try:
+            self.driver.execute_script(MARK_ACTION_SCRIPT, as_locator(ready_locator) if ready_locator else None)
+        except WebDriverException as error:
+            self.logger.debug(f"Could not mark action start: {error}")
+    
+    def get_page_metrics(self) -> dict:
+        """Collect Navigation and Paint Timing metrics (ms) measured by the browser"""
+        return self.driver.execute_script(PAGE_METRICS_SCRIPT, ACTION_MARK, READY_MARK)
+    
     def get_current_url(self) -> str:
         """Get current page URL"""
         return self.driver.current_url
     
     def navigate_to(self, url: str) -> None:
         """Navigate to specific URL"""
+        invalidate_page_state(self.driver)
         self.driver.get(url)
         self.logger.info(f"Navigated to: {url}")
     
     def refresh_page(self) -> None:
         """Refresh current page"""
+        invalidate_page_state(self.driver)
         self.driver.refresh()
         self.logger.info("Page refreshed")
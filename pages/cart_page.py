@@ -3,26 +3,28 @@ Cart Page Object Model
 """
 
 from typing import Optional
-from pages.base_page import BasePage
+from pages.base_page import BasePage, LOADED_CHECK_ROUND_TRIPS
 from features.locators import Locators
+from utils.driver_commands import round_trip_budget
 
 
 class CartPage(BasePage):
     """Page Object Model for the SauceDemo cart page"""
+
+    SNAPSHOT_LOCATORS = (Locators.CART_PAGE_TITLE,)
     
     def __init__(self, driver):
         super().__init__(driver)
     
+    @round_trip_budget(LOADED_CHECK_ROUND_TRIPS)
     def is_cart_page_loaded(self) -> bool:
         """Check if cart page is loaded"""
-        return (
-            "cart" in self.get_current_url().lower() and
-            self.is_element_present(Locators.CART_PAGE_TITLE)
-        )
+        state = self.snapshot(required=[Locators.CART_PAGE_TITLE], url_contains="cart")
+        return "cart" in state.url.lower() and state.is_present(Locators.CART_PAGE_TITLE)
     
     def get_cart_page_title(self) -> Optional[str]:
         """Get the cart page title"""
-        return self.get_text(Locators.CART_PAGE_TITLE)
+        return self.snapshot(required=[Locators.CART_PAGE_TITLE]).text(Locators.CART_PAGE_TITLE)
     
     def is_correct_cart_title(self) -> bool:
         """Check if cart page title is 'Your Cart'"""
@@ -32,12 +34,12 @@ class CartPage(BasePage):
     def is_product_in_cart(self, product_name: str) -> bool:
         """Check if a specific product is in the cart"""
         cart_item_locator = Locators.cart_item(product_name)
-        return self.is_element_present(cart_item_locator)
+        return self.snapshot(required=[cart_item_locator]).is_present(cart_item_locator)
     
     def get_cart_item_text(self, product_name: str) -> Optional[str]:
         """Get the text of a cart item"""
         cart_item_locator = Locators.cart_item(product_name)
-        return self.get_text(cart_item_locator)
+        return self.snapshot(required=[cart_item_locator]).text(cart_item_locator)
     
     def click_checkout_button(self) -> bool:
         """Click the checkout button"""
@@ -45,6 +47,9 @@ class CartPage(BasePage):
     
     def verify_cart_contents(self, product_name: str) -> bool:
         """Verify that a product is in the cart with correct title"""
+        # One snapshot answers all of the checks below
+        self.snapshot(required=[Locators.CART_PAGE_TITLE, Locators.cart_item(product_name)],
+                      url_contains="cart")
         if not self.is_cart_page_loaded():
             self.logger.error("Cart page not loaded")
             return False
@@ -3,26 +3,28 @@ Checkout Complete Page Object Model
 """
 
 from typing import Optional
-from pages.base_page import BasePage
+from pages.base_page import BasePage, LOADED_CHECK_ROUND_TRIPS
 from features.locators import Locators
+from utils.driver_commands import round_trip_budget
 
 
 class CheckoutCompletePage(BasePage):
     """Page Object Model for the SauceDemo checkout complete page"""
+
+    SNAPSHOT_LOCATORS = (Locators.CHECKOUT_COMPLETE,)
     
     def __init__(self, driver):
         super().__init__(driver)
     
+    @round_trip_budget(LOADED_CHECK_ROUND_TRIPS)
     def is_complete_page_loaded(self) -> bool:
         """Check if checkout complete page is loaded"""
-        return (
-            "checkout-complete" in self.get_current_url() and
-            self.is_element_present(Locators.CHECKOUT_COMPLETE)
-        )
+        state = self.snapshot(required=[Locators.CHECKOUT_COMPLETE], url_contains="checkout-complete")
+        return "checkout-complete" in state.url and state.is_present(Locators.CHECKOUT_COMPLETE)
     
     def get_complete_page_title(self) -> Optional[str]:
         """Get the checkout complete page title"""
-        return self.get_text(Locators.CHECKOUT_COMPLETE)
+        return self.snapshot(required=[Locators.CHECKOUT_COMPLETE]).text(Locators.CHECKOUT_COMPLETE)
     
     def is_correct_complete_title(self) -> bool:
         """Check if complete page title is 'Checkout: Complete!'"""
@@ -3,26 +3,28 @@ Checkout Overview Page Object Model
 """
 
 from typing import Optional
-from pages.base_page import BasePage
+from pages.base_page import BasePage, LOADED_CHECK_ROUND_TRIPS
 from features.locators import Locators
+from utils.driver_commands import round_trip_budget
 
 
 class CheckoutOverviewPage(BasePage):
     """Page Object Model for the SauceDemo checkout overview page"""
+
+    SNAPSHOT_LOCATORS = (Locators.CHECKOUT_OVERVIEW,)
     
     def __init__(self, driver):
         super().__init__(driver)
     
+    @round_trip_budget(LOADED_CHECK_ROUND_TRIPS)
     def is_overview_page_loaded(self) -> bool:
         """Check if checkout overview page is loaded"""
-        return (
-            "checkout-step-two" in self.get_current_url() and
-            self.is_element_present(Locators.CHECKOUT_OVERVIEW)
-        )
+        state = self.snapshot(required=[Locators.CHECKOUT_OVERVIEW], url_contains="checkout-step-two")
+        return "checkout-step-two" in state.url and state.is_present(Locators.CHECKOUT_OVERVIEW)
     
     def get_overview_page_title(self) -> Optional[str]:
         """Get the checkout overview page title"""
-        return self.get_text(Locators.CHECKOUT_OVERVIEW)
+        return self.snapshot(required=[Locators.CHECKOUT_OVERVIEW]).text(Locators.CHECKOUT_OVERVIEW)
     
     def is_correct_overview_title(self) -> bool:
         """Check if overview page title is 'Checkout: Overview'"""
@@ -3,26 +3,28 @@ Checkout Page Object Model
 """
 
 from typing import Optional, Dict
-from pages.base_page import BasePage
+from pages.base_page import BasePage, LOADED_CHECK_ROUND_TRIPS
 from features.locators import Locators
+from utils.driver_commands import round_trip_budget
 
 
 class CheckoutPage(BasePage):
     """Page Object Model for the SauceDemo checkout page"""
+
+    SNAPSHOT_LOCATORS = (Locators.CHECKOUT_PAGE,)
     
     def __init__(self, driver):
         super().__init__(driver)
     
+    @round_trip_budget(LOADED_CHECK_ROUND_TRIPS)
     def is_checkout_page_loaded(self) -> bool:
         """Check if checkout page is loaded"""
-        return (
-            "checkout-step-one" in self.get_current_url() and
-            self.is_element_present(Locators.CHECKOUT_PAGE)
-        )
+        state = self.snapshot(required=[Locators.CHECKOUT_PAGE], url_contains="checkout-step-one")
+        return "checkout-step-one" in state.url and state.is_present(Locators.CHECKOUT_PAGE)
     
     def get_checkout_page_title(self) -> Optional[str]:
         """Get the checkout page title"""
-        return self.get_text(Locators.CHECKOUT_PAGE)
+        return self.snapshot(required=[Locators.CHECKOUT_PAGE]).text(Locators.CHECKOUT_PAGE)
     
     def is_correct_checkout_title(self) -> bool:
         """Check if checkout page title is correct"""
@@ -45,11 +47,11 @@ class CheckoutPage(BasePage):
         """Fill the complete checkout form"""
         self.logger.info(f"Filling checkout form with data: {checkout_data}")
         
-        first_name_success = self.enter_first_name(checkout_data.get("First Name", ""))
-        last_name_success = self.enter_last_name(checkout_data.get("Last Name", ""))
-        postal_code_success = self.enter_postal_code(checkout_data.get("Zip/Postal Code", ""))
-        
-        return first_name_success and last_name_success and postal_code_success
+        return self.fill_form([
+            (Locators.FIRST_NAME, checkout_data.get("First Name", "")),
+            (Locators.LAST_NAME, checkout_data.get("Last Name", "")),
+            (Locators.POSTAL_CODE, checkout_data.get("Zip/Postal Code", "")),
+        ])
     
     def click_continue_button(self) -> bool:
         """Click the continue button"""
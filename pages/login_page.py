@@ -3,12 +3,15 @@ Login Page Object Model
 """
 
 from typing import Optional
-from pages.base_page import BasePage
+from pages.base_page import BasePage, LOADED_CHECK_ROUND_TRIPS
 from features.locators import Locators
+from utils.driver_commands import round_trip_budget
 
 
 class LoginPage(BasePage):
     """Page Object Model for the SauceDemo login page"""
+
+    SNAPSHOT_LOCATORS = (Locators.LOGIN_BUTTON, Locators.ERROR_MESSAGE_CONTAINER)
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -19,12 +22,11 @@ class LoginPage(BasePage):
         self.navigate_to(self.url)
         self.logger.info("Navigated to login page")
     
+    @round_trip_budget(LOADED_CHECK_ROUND_TRIPS)
     def is_login_page_loaded(self) -> bool:
         """Check if login page is loaded"""
-        return (
-            self.url in self.get_current_url() and 
-            self.is_element_present(Locators.LOGIN_BUTTON)
-        )
+        state = self.snapshot(required=[Locators.LOGIN_BUTTON], url_contains=self.url)
+        return self.url in state.url and state.is_present(Locators.LOGIN_BUTTON)
     
     def enter_username(self, username: str) -> bool:
         """Enter username in the username field"""
@@ -42,26 +44,55 @@ class LoginPage(BasePage):
         """Perform complete login process"""
         self.logger.info(f"Attempting login with username: {username}")
         
-        # Enter credentials
-        username_success = self.enter_username(username)
-        password_success = self.enter_password(password)
-        
-        if not (username_success and password_success):
-            self.logger.error("Failed to enter credentials")
-            return False
+        # Enter credentials and click login button in one round trip
+        success = self.fill_form(
+            [(Locators.USERNAME_FIELD, username), (Locators.PASSWORD_FIELD, password)],
+            submit_locator=Locators.LOGIN_BUTTON,
+            # Lets the browser time the login until the inventory renders
+            ready_locator=Locators.INVENTORY_CONTAINER,
+        )
         
-        # Click login button
-        return self.click_login_button()
+        if not success:
+            self.logger.error("Failed to enter credentials or click login button")
+        return success
+    
+    def capture_session(self) -> dict:
+        """Capture the logged-in session's cookies and localStorage"""
+        return {
+            "cookies": self.driver.get_cookies(),
+            "local_storage": self.driver.execute_script(
+                "return Object.assign({}, window.localStorage);"
+            ),
+        }
+    
+    def restore_session(self, session: dict) -> None:
+        """Inject a captured session and open the inventory page, skipping the login form.
+
+        The browser must already be on the login page so cookies and storage
+        are set for the right origin.
+        """
+        for cookie in session["cookies"]:
+            self.driver.add_cookie(cookie)
+        self.driver.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) {"
+            " window.localStorage.setItem(key, value); }",
+            session["local_storage"],
+        )
+        self.navigate_to(f"{self.url}inventory.html")
+        self.logger.info("Restored cached session")
     
     def is_error_message_displayed(self) -> bool:
         """Check if error message is displayed"""
-        return self.is_element_present(Locators.ERROR_MESSAGE_CONTAINER, timeout=3)
+        state = self.snapshot(required=[Locators.ERROR_MESSAGE_CONTAINER], timeout=3)
+        return state.is_present(Locators.ERROR_MESSAGE_CONTAINER)
     
     def get_error_message(self) -> Optional[str]:
         """Get the error message text"""
         if self.is_error_message_displayed():
             # Use the generic error container to get the text
-            error_text = self.get_text(Locators.ERROR_MESSAGE_CONTAINER, timeout=2)
+            error_text = self.snapshot(required=[Locators.ERROR_MESSAGE_CONTAINER]).text(
+                Locators.ERROR_MESSAGE_CONTAINER
+            )
             if error_text:
                 # Clean up the text by removing any button text or extra whitespace
                 # The error text might include the close button, so we need to extract just the error message
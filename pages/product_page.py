@@ -3,26 +3,28 @@ Product Page Object Model
 """
 
 from typing import Optional
-from pages.base_page import BasePage
+from pages.base_page import BasePage, LOADED_CHECK_ROUND_TRIPS
 from features.locators import Locators
+from utils.driver_commands import round_trip_budget
 
 
 class ProductPage(BasePage):
     """Page Object Model for the SauceDemo product/inventory page"""
+
+    SNAPSHOT_LOCATORS = (Locators.PRODUCT_PAGE,)
     
     def __init__(self, driver):
         super().__init__(driver)
     
+    @round_trip_budget(LOADED_CHECK_ROUND_TRIPS)
     def is_product_page_loaded(self) -> bool:
         """Check if product page is loaded"""
-        return (
-            "inventory.html" in self.get_current_url() and
-            self.is_element_present(Locators.PRODUCT_PAGE)
-        )
+        state = self.snapshot(required=[Locators.PRODUCT_PAGE], url_contains="inventory.html")
+        return "inventory.html" in state.url and state.is_present(Locators.PRODUCT_PAGE)
     
     def get_page_title(self) -> Optional[str]:
         """Get the product page title"""
-        return self.get_text(Locators.PRODUCT_PAGE)
+        return self.snapshot(required=[Locators.PRODUCT_PAGE]).text(Locators.PRODUCT_PAGE)
     
     def is_correct_page_title(self) -> bool:
         """Check if page title is 'Products'"""
@@ -60,19 +62,10 @@ class ProductPage(BasePage):
     
     def wait_for_page_load(self, timeout: int = 5) -> bool:
         """Wait for inventory container to load (for performance testing)"""
-        try:
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.common.by import By
-            from selenium.common.exceptions import TimeoutException
-            
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located((By.ID, "inventory_container"))
-            )
-            return True
-        except TimeoutException:
+        if self.wait_for_element(Locators.INVENTORY_CONTAINER, visible=True, timeout=timeout) is None:
             self.logger.error(f"Inventory container did not load within {timeout}s")
             return False
+        return True
     
     def add_product_to_cart(self, product_name: str) -> bool:
         """Add a product to the cart"""
@@ -0,0 +1,286 @@
+"""
+In-process stand-in for the restful-booker API.
+
+A threaded, in-memory implementation of the /auth and /booking endpoints the
+API steps use, with restful-booker's status codes: 200 for reads, creates and
+updates, 201 for deletes, 403 for a missing or bad token and 404 for unknown
+bookings. Start it with BOOKER_STUB=1 to run the API suite offline.
+
+It can also be run on its own as a stable baseline for the load runner:
+    python -m utils.booker_stub --port 3001
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import logging
+import re
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+USERNAME = "admin"
+PASSWORD = "password123"
+
+BOOKING_FIELDS = ("firstname", "lastname", "totalprice", "depositpaid", "bookingdates")
+BOOKING_PATH = re.compile(r"^/booking/(\d+)$")
+
+
+class BookingStore:
+    """Thread-safe in-memory bookings and issued tokens"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bookings = {}
+        self.tokens = set()
+        self._ids = itertools.count(1)
+
+    def issue_token(self) -> str:
+        token = secrets.token_hex(8)
+        with self.lock:
+            self.tokens.add(token)
+        return token
+
+    def is_valid_token(self, token: str) -> bool:
+        with self.lock:
+            return token in self.tokens
+
+    def create(self, booking: dict) -> int:
+        with self.lock:
+            booking_id = next(self._ids)
+            self.bookings[booking_id] = booking
+        return booking_id
+
+    def get(self, booking_id: int):
+        with self.lock:
+            return self.bookings.get(booking_id)
+
+    def replace(self, booking_id: int, booking: dict) -> bool:
+        with self.lock:
+            if booking_id not in self.bookings:
+                return False
+            self.bookings[booking_id] = booking
+            return True
+
+    def update(self, booking_id: int, changes: dict):
+        with self.lock:
+            booking = self.bookings.get(booking_id)
+            if booking is None:
+                return None
+            dates = {**booking["bookingdates"], **changes.get("bookingdates", {})}
+            booking.update(changes)
+            booking["bookingdates"] = dates
+            return dict(booking)
+
+    def delete(self, booking_id: int) -> bool:
+        with self.lock:
+            return self.bookings.pop(booking_id, None) is not None
+
+
+def _normalise_booking(body) -> dict:
+    """Keep the restful-booker booking fields, or raise ValueError if any are missing"""
+    if not isinstance(body, dict) or any(field not in body for field in BOOKING_FIELDS):
+        raise ValueError("Missing booking fields")
+    booking = {field: body[field] for field in BOOKING_FIELDS}
+    booking["bookingdates"] = {
+        "checkin": body["bookingdates"]["checkin"],
+        "checkout": body["bookingdates"]["checkout"],
+    }
+    if "additionalneeds" in body:
+        booking["additionalneeds"] = body["additionalneeds"]
+    return booking
+
+
+class BookerRequestHandler(BaseHTTPRequestHandler):
+    """Routes restful-booker requests to the server's BookingStore"""
+
+    protocol_version = "HTTP/1.1"
+    # Buffer each response into a single write so keep-alive clients don't
+    # stall on delayed ACKs between the header and body segments
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    @property
+    def store(self) -> BookingStore:
+        return self.server.store
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload) -> None:
+        self._send(status, json.dumps(payload).encode(), "application/json; charset=utf-8")
+
+    def _send_text(self, status: int, text: str) -> None:
+        self._send(status, text.encode(), "text/plain; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw or b"null")
+
+    def _is_authorised(self) -> bool:
+        cookie = self.headers.get("Cookie", "")
+        match = re.search(r"(?:^|;\s*)token=([^;]*)", cookie)
+        if match and self.store.is_valid_token(match.group(1)):
+            return True
+        authorization = self.headers.get("Authorization", "")
+        if authorization.startswith("Basic "):
+            expected = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+            return authorization[len("Basic "):] == expected
+        return False
+
+    def _booking_id(self):
+        match = BOOKING_PATH.match(self.path.split("?", 1)[0])
+        return int(match.group(1)) if match else None
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        path = self.path.split("?", 1)[0]
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send_text(400, "Bad Request")
+            return
+
+        if path == "/auth":
+            credentials = body if isinstance(body, dict) else {}
+            if credentials.get("username") == USERNAME and credentials.get("password") == PASSWORD:
+                self._send_json(200, {"token": self.store.issue_token()})
+            else:
+                self._send_json(200, {"reason": "Bad credentials"})
+        elif path == "/booking":
+            try:
+                booking = _normalise_booking(body)
+            except (ValueError, KeyError, TypeError):
+                self._send_text(500, "Internal Server Error")
+                return
+            booking_id = self.store.create(booking)
+            self._send_json(200, {"bookingid": booking_id, "booking": booking})
+        else:
+            self._send_text(404, "Not Found")
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        path = self.path.split("?", 1)[0]
+        if path == "/ping":
+            self._send_text(201, "Created")
+            return
+        if path == "/booking":
+            with self.store.lock:
+                ids = sorted(self.store.bookings)
+            self._send_json(200, [{"bookingid": booking_id} for booking_id in ids])
+            return
+
+        booking_id = self._booking_id()
+        booking = self.store.get(booking_id) if booking_id is not None else None
+        if booking is None:
+            self._send_text(404, "Not Found")
+        else:
+            self._send_json(200, booking)
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        if not self._authorised_booking_request():
+            return
+        try:
+            booking = _normalise_booking(self._read_json())
+        except (ValueError, KeyError, TypeError):
+            self._send_text(400, "Bad Request")
+            return
+        if self.store.replace(self._booking_id(), booking):
+            self._send_json(200, booking)
+        else:
+            self._send_text(405, "Method Not Allowed")
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        if not self._authorised_booking_request():
+            return
+        try:
+            changes = self._read_json()
+        except ValueError:
+            self._send_text(400, "Bad Request")
+            return
+        booking = self.store.update(self._booking_id(), changes if isinstance(changes, dict) else {})
+        if booking is None:
+            self._send_text(405, "Method Not Allowed")
+        else:
+            self._send_json(200, booking)
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        if not self._authorised_booking_request():
+            return
+        if self.store.delete(self._booking_id()):
+            self._send_text(201, "Created")
+        else:
+            self._send_text(405, "Method Not Allowed")
+
+    def _authorised_booking_request(self) -> bool:
+        """Reject unknown paths with 404 and missing or bad tokens with 403"""
+        if self._booking_id() is None:
+            # Drain the body so the keep-alive connection stays usable
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self._send_text(404, "Not Found")
+            return False
+        if not self._is_authorised():
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self._send_text(403, "Forbidden")
+            return False
+        return True
+
+
+class BookerStubServer(ThreadingHTTPServer):
+    """Threaded restful-booker stand-in serving from a background thread"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), BookerRequestHandler)
+        self.store = BookingStore()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "BookerStubServer":
+        """Serve requests from a daemon thread and return self"""
+        self._thread = threading.Thread(target=self.serve_forever, name="booker-stub", daemon=True)
+        self._thread.start()
+        logger.info("restful-booker stub listening on %s", self.base_url)
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the in-memory restful-booker stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = BookerStubServer(args.host, args.port)
+    logger.info("restful-booker stub listening on %s", server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Booking payload builders shared by the API steps and the load runner.
+
+Rows are Gherkin table rows (or plain dicts of strings with the same
+headings), exactly as they appear in features/api.feature.
+"""
+
+
+def _headings(row):
+    # behave's Row iterates over its cells, so membership must use headings
+    return row.headings if hasattr(row, "headings") else list(row.keys())
+
+
+def booking_details_from_row(row) -> dict:
+    """Build flat booking details from a booking table row"""
+    return {
+        "firstname": row["firstname"],
+        "lastname": row["lastname"],
+        "totalprice": int(row["totalprice"]),
+        "depositpaid": row["depositpaid"].lower() == "true",
+        "checkin": row["checkin"],
+        "checkout": row["checkout"],
+        "additionalneeds": row["additionalneeds"] if row["additionalneeds"] not in ["None", "null", ""] else None
+    }
+
+
+def partial_update_from_row(row) -> dict:
+    """Build a PATCH body from whichever columns the row provides"""
+    headings = _headings(row)
+    partial_update = {}
+
+    if "totalprice" in headings:
+        partial_update["totalprice"] = int(row["totalprice"])
+    if "depositpaid" in headings:
+        partial_update["depositpaid"] = row["depositpaid"].lower() == "true"
+    if "checkin" in headings:
+        partial_update.setdefault("bookingdates", {})["checkin"] = row["checkin"]
+    if "checkout" in headings:
+        partial_update.setdefault("bookingdates", {})["checkout"] = row["checkout"]
+    return partial_update
+
+
+def booking_request_body(details: dict) -> dict:
+    """Convert flat booking details into the API's request body"""
+    body = details.copy()
+    body["bookingdates"] = {
+        "checkin": body.pop("checkin"),
+        "checkout": body.pop("checkout")
+    }
+    return body
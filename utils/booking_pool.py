@@ -0,0 +1,165 @@
+"""
+Pre-provisioned booking fixtures for the API scenarios.
+
+Bookings are created concurrently ahead of time and handed out one per
+scenario, so "a booking has been created" no longer puts a POST on the
+critical path of read, update and delete scenarios. Stock is kept per
+booking payload and refilled in the background when it runs low. Bookings
+still in stock at the end of the run are deleted, so the target is left as
+it was found.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from utils.booking_payloads import booking_request_body
+from utils.http_client import HttpClient
+from utils.token_cache import TokenCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZE = 5
+DEFAULT_WORKERS = 4
+
+BOOKING_ENDPOINT = "booking"
+AUTH_ENDPOINT = "auth"
+
+# restful-booker's default admin, as used by the API steps, authorises deleting leftovers
+USERNAME = "admin"
+PASSWORD = "password123"
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+}
+
+
+class BookingPool:
+    """Stock of freshly created bookings, keyed by the payload they were created with.
+
+    The pool owns its HTTP client and closes it in close().
+    """
+
+    def __init__(self, http: HttpClient, base_url: str, size: int = DEFAULT_SIZE,
+                 workers: int = DEFAULT_WORKERS, token_cache: Optional[TokenCache] = None):
+        self.http = http
+        self.base_url = base_url
+        self.url = f"{base_url}{BOOKING_ENDPOINT}"
+        self.token_cache = token_cache
+        self.size = size
+        self.low_water = max(1, size // 2)
+        self.created = 0
+        self.handed_out = 0
+        self.deleted = 0
+        self._stock = {}
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="booking-pool")
+
+    @classmethod
+    def from_env(cls, base_url: str, token_cache: Optional[TokenCache] = None) -> Optional["BookingPool"]:
+        """Build a pool from BOOKING_POOL_SIZE, or None if it is set to 0"""
+        size = int(os.getenv("BOOKING_POOL_SIZE", DEFAULT_SIZE))
+        return cls(HttpClient.from_env(), base_url, size=size, token_cache=token_cache) if size > 0 else None
+
+    def prime(self, details: dict) -> None:
+        """Start creating stock for a payload in the background"""
+        body = booking_request_body(details)
+        self._refill(self._key(body), body)
+
+    def acquire(self, details: dict) -> Optional[Tuple[str, dict]]:
+        """Hand out a (bookingid, booking) created with these details, or None.
+
+        Waits for an in-flight creation rather than returning None while one
+        is pending, and tops the stock up in the background.
+        """
+        body = booking_request_body(details)
+        key = self._key(body)
+        with self._condition:
+            stock = self._stock.setdefault(key, deque())
+            if not stock and self._pending.get(key):
+                self._condition.wait_for(
+                    lambda: stock or not self._pending.get(key), timeout=self.http.timeout
+                )
+            fixture = stock.popleft() if stock else None
+            if fixture is not None:
+                self.handed_out += 1
+        self._refill(key, body)
+        return fixture
+
+    def close(self) -> None:
+        """Stop refilling, delete unused stock, close the HTTP client and log the pool's counters"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._condition:
+            leftover = [bookingid for stock in self._stock.values() for bookingid, _ in stock]
+            self._stock = {}
+        if leftover:
+            self._delete(leftover)
+        self.http.close()
+        logger.info("Booking pool: %d created, %d handed out, %d unused deleted",
+                    self.created, self.handed_out, self.deleted)
+
+    def _delete(self, bookingids: List[str]) -> None:
+        try:
+            token = self._token()
+            for bookingid in bookingids:
+                response = self.http.delete(f"{self.url}/{bookingid}",
+                                            headers={**HEADERS, "Cookie": f"token={token}"})
+                if response.status_code == 201:
+                    self.deleted += 1
+                else:
+                    logger.warning("Booking pool delete of %s failed: %s - %s",
+                                   bookingid, response.status_code, response.text)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Booking pool could not delete unused bookings: %s", error)
+
+    def _token(self) -> str:
+        if self.token_cache is None:
+            return self._request_token()
+        return self.token_cache.get_or_fetch(self.base_url, USERNAME, self._request_token)
+
+    def _request_token(self) -> str:
+        response = self.http.post(f"{self.base_url}{AUTH_ENDPOINT}", headers=HEADERS,
+                                  json={"username": USERNAME, "password": PASSWORD})
+        token = response.json().get("token") if response.status_code == 200 else None
+        if not token:
+            raise RuntimeError(f"Authentication failed: {response.status_code} - {response.text}")
+        return token
+
+    @staticmethod
+    def _key(body: dict) -> str:
+        return json.dumps(body, sort_keys=True)
+
+    def _refill(self, key: str, body: dict) -> None:
+        with self._condition:
+            available = len(self._stock.setdefault(key, deque())) + self._pending.get(key, 0)
+            if available >= self.low_water:
+                return
+            missing = self.size - available
+            self._pending[key] = self._pending.get(key, 0) + missing
+        for _ in range(missing):
+            self._executor.submit(self._create, key, body)
+
+    def _create(self, key: str, body: dict) -> None:
+        fixture = None
+        try:
+            response = self.http.post(self.url, headers=HEADERS, json=body)
+            if response.status_code == 200:
+                data = response.json()
+                fixture = (str(data["bookingid"]), data["booking"])
+            else:
+                logger.warning("Booking pool create failed: %s - %s", response.status_code, response.text)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Booking pool create failed: %s", error)
+
+        with self._condition:
+            self._pending[key] -= 1
+            if fixture is not None:
+                self._stock[key].append(fixture)
+                self.created += 1
+            self._condition.notify_all()
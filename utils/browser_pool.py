@@ -0,0 +1,144 @@
+"""
+Per-worker browser pool for UI scenarios.
+
+Keeps one long-lived Chrome driver per worker process and resets it between
+scenarios instead of paying a Chrome cold start for every scenario.
+"""
+
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.driver_resolver import shared_chrome_service, stop_shared_service
+
+logger = logging.getLogger(__name__)
+
+# Scenarios tagged with this get a dedicated browser that is quit afterwards
+FRESH_BROWSER_TAG = "fresh-browser"
+
+# Attribute holding the profile copy a pooled browser was launched with
+PROFILE_ATTRIBUTE = "_behave_profile_dir"
+
+RESET_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+def create_chrome_driver(user_data_dir=None):
+    """Launch a headless Chrome driver with the suite's default options.
+
+    Every launch reuses the shared chromedriver service, whose binary is
+    resolved once per machine (see utils.driver_resolver). user_data_dir
+    points Chrome at an existing profile (see utils.browser_profile).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    # Set Chrome options
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Enable headless mode
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--no-proxy-server")
+    if user_data_dir:
+        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+
+    # Disable password save popup and leak detection
+    prefs = {
+        "credentials_enable_service": False,
+        "profile.password_manager_enabled": False,
+        "profile.password_manager_leak_detection": False
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+
+    driver = webdriver.Chrome(service=shared_chrome_service(), options=chrome_options)
+    driver.maximize_window()
+    return driver
+
+
+class BrowserPool:
+    """Hands out a reusable browser and resets it between scenarios.
+
+    With a profile template, the first launch builds it and every launched
+    browser gets its own copy of it, deleted when the browser quits.
+    """
+
+    def __init__(self, factory=create_chrome_driver, profile=None):
+        self.factory = factory
+        self.profile = profile
+        self._idle = None
+        self.launches = 0
+        self.reuses = 0
+
+    def acquire(self, fresh: bool = False):
+        """Return the pooled browser, or a new one if none is idle or fresh is set"""
+        if not fresh and self._idle is not None:
+            driver, self._idle = self._idle, None
+            self.reuses += 1
+            return driver
+        return self._launch()
+
+    def release(self, driver, discard: bool = False) -> None:
+        """Reset the browser and keep it for the next scenario, or quit it"""
+        if discard or self._idle is not None or not self._reset(driver):
+            self._quit(driver)
+            return
+        self._idle = driver
+
+    def close(self) -> None:
+        """Quit the idle browser, drop a run-owned profile template, stop chromedriver and log launch/reuse counts"""
+        if self._idle is not None:
+            self._quit(self._idle)
+            self._idle = None
+        if self.profile is not None:
+            self.profile.close()
+        stop_shared_service()
+        logger.info("Browser pool: %d launches, %d reuses", self.launches, self.reuses)
+
+    @property
+    def stats(self) -> dict:
+        """Launch and reuse counters for reporting"""
+        return {"launches": self.launches, "reuses": self.reuses}
+
+    def _launch(self):
+        if self.profile is None:
+            driver = self.factory()
+        else:
+            self.profile.ensure(self.factory)
+            profile_dir = self.profile.clone()
+            try:
+                driver = self.factory(user_data_dir=profile_dir)
+            except Exception:
+                self.profile.remove(profile_dir)
+                raise
+            setattr(driver, PROFILE_ATTRIBUTE, profile_dir)
+        self.launches += 1
+        return driver
+
+    def _reset(self, driver) -> bool:
+        """Clear cookies and web storage and park the browser on about:blank"""
+        try:
+            # Storage is per origin, so clear it before leaving the app's page
+            driver.execute_script(RESET_STORAGE_SCRIPT)
+            try:
+                # Clears cookies for every domain, not just the current one
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except (AttributeError, WebDriverException):
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except WebDriverException as error:
+            logger.warning("Browser reset failed, discarding it: %s", error)
+            return False
+
+    def _quit(self, driver) -> None:
+        try:
+            driver.quit()
+        except WebDriverException as error:
+            logger.warning("Browser quit failed: %s", error)
+        profile_dir = getattr(driver, PROFILE_ATTRIBUTE, None)
+        if profile_dir:
+            self.profile.remove(profile_dir)
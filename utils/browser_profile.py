@@ -0,0 +1,214 @@
+"""
+Warmed Chrome profile template for UI scenarios.
+
+A fresh Chrome profile starts with a cold HTTP cache and cold compiled-script
+(V8 code) cache, so the first SauceDemo page in every browser pays for the
+app bundle again. The template is built once per run by visiting the app's
+main pages, then each launched browser gets its own copy as --user-data-dir.
+Cookies and web storage are cleared before the template is saved, so
+scenarios still start logged out.
+
+Warming is optional. Measure what it saves with:
+    python -m utils.browser_profile --measure --repeat 5
+
+Environment:
+    BROWSER_PROFILE_WARMUP    set to 1 to build and use a warmed profile (default: off)
+    BROWSER_PROFILE_TEMPLATE  template directory; an existing template is reused (default: a temp dir per run)
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.browser_pool import RESET_STORAGE_SCRIPT, create_chrome_driver
+from utils.driver_resolver import stop_shared_service
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+APP_URL = "https://www.saucedemo.com/"
+
+# Pages visited while warming; those after the login page need a session
+WARMUP_PAGES = ["", "inventory.html", "inventory-item.html?id=4", "cart.html", "checkout-step-one.html"]
+
+# SauceDemo keeps its login in this cookie, so warming skips the login form
+SESSION_COOKIE = {"name": "session-username", "value": "standard_user"}
+
+# Marker written once the template is complete
+READY_MARKER = "behave-profile-ready"
+
+# Profile contents that don't speed up page loads, removed from the template
+PRUNED = ["Crashpad", "GrShaderCache", "ShaderCache", "GraphiteDawnCache", "Safe Browsing",
+          "component_crx_cache", "optimization_guide_model_store", "segmentation_platform",
+          "BrowserMetrics", "OnDeviceHeadSuggestModel"]
+
+# Files tied to the Chrome process that wrote the template
+NOT_COPIED = ("Singleton*", "lockfile", "*.tmp", "*.pma")
+
+NAVIGATION_TIMING_SCRIPT = """
+const [navigation] = performance.getEntriesByType('navigation');
+return navigation ? navigation.toJSON() : null;
+"""
+
+
+class ProfileTemplate:
+    """A warmed Chrome user data directory copied for every browser launch"""
+
+    def __init__(self, path: str, app_url: str = APP_URL, owned: bool = False):
+        self.path = path
+        self.app_url = app_url
+        self.owned = owned
+
+    @classmethod
+    def from_env(cls) -> Optional["ProfileTemplate"]:
+        """Template at BROWSER_PROFILE_TEMPLATE or a per-run temp dir, or None when warming is off"""
+        path = os.getenv("BROWSER_PROFILE_TEMPLATE")
+        if path:
+            return cls(path)
+        if os.getenv("BROWSER_PROFILE_WARMUP", "").lower() in ("1", "true", "yes"):
+            return cls(tempfile.mkdtemp(prefix="behave-chrome-template-"), owned=True)
+        return None
+
+    @property
+    def ready(self) -> bool:
+        return os.path.isfile(os.path.join(self.path, READY_MARKER))
+
+    def ensure(self, factory: Callable = create_chrome_driver) -> None:
+        """Build the template unless it exists; parallel workers wait for the first builder"""
+        if self.ready:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with file_lock(self.path.rstrip(os.sep)):
+            if not self.ready:
+                self.build(factory)
+
+    def build(self, factory: Callable = create_chrome_driver) -> None:
+        """Visit the app's main pages with the template as the profile, then strip session state"""
+        started = time.perf_counter()
+        driver = factory(user_data_dir=self.path)
+        try:
+            driver.get(self.app_url)
+            driver.add_cookie(SESSION_COOKIE)
+            for page in WARMUP_PAGES:
+                driver.get(self.app_url + page)
+            driver.execute_script(RESET_STORAGE_SCRIPT)
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        finally:
+            # Chrome writes its caches to disk on exit
+            driver.quit()
+        for name in PRUNED:
+            for root in (self.path, os.path.join(self.path, "Default")):
+                target = os.path.join(root, name)
+                if os.path.isdir(target):
+                    shutil.rmtree(target, ignore_errors=True)
+        with open(os.path.join(self.path, READY_MARKER), "w") as f:
+            f.write(self.app_url)
+        logger.info("Warmed Chrome profile template in %.1f s: %s", time.perf_counter() - started, self.path)
+
+    def clone(self) -> str:
+        """Copy the template into a new directory for one browser"""
+        target = tempfile.mkdtemp(prefix="behave-chrome-profile-")
+        shutil.copytree(self.path, target, dirs_exist_ok=True, ignore=shutil.ignore_patterns(*NOT_COPIED))
+        return target
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """Delete a browser's copy once the browser has quit"""
+        shutil.rmtree(path, ignore_errors=True)
+
+    def close(self) -> None:
+        """Delete the template if this run created it"""
+        if self.owned:
+            shutil.rmtree(self.path, ignore_errors=True)
+            try:
+                os.remove(f"{self.path.rstrip(os.sep)}.lock")
+            except FileNotFoundError:
+                pass
+
+
+def first_page_timing(user_data_dir: Optional[str], url: str) -> dict:
+    """Navigation Timing (ms) of the first page a new browser opens with this profile"""
+    driver = create_chrome_driver(user_data_dir=user_data_dir)
+    try:
+        started = time.perf_counter()
+        driver.get(url)
+        navigation = driver.execute_script(NAVIGATION_TIMING_SCRIPT) or {}
+        return {
+            "get_ms": (time.perf_counter() - started) * 1000,
+            "dom_content_loaded_ms": navigation.get("domContentLoadedEventEnd"),
+            "load_event_ms": navigation.get("loadEventEnd"),
+            "transfer_bytes": navigation.get("transferSize"),
+        }
+    finally:
+        driver.quit()
+
+
+def measure(template: ProfileTemplate, repeat: int) -> dict:
+    """Median first-page timings with an empty profile against a copy of the template"""
+    template.ensure()
+    results = {"cold": [], "warm": []}
+    for _ in range(repeat):
+        empty = tempfile.mkdtemp(prefix="behave-chrome-profile-")
+        warm = template.clone()
+        try:
+            results["cold"].append(first_page_timing(empty, template.app_url))
+            results["warm"].append(first_page_timing(warm, template.app_url))
+        finally:
+            ProfileTemplate.remove(empty)
+            ProfileTemplate.remove(warm)
+
+    summary = {}
+    for profile, runs in results.items():
+        summary[profile] = {
+            key: statistics.median(run[key] for run in runs if run[key] is not None)
+            for key in runs[0]
+            if any(run[key] is not None for run in runs)
+        }
+    cold, warm = summary["cold"].get("load_event_ms"), summary["warm"].get("load_event_ms")
+    if cold and warm:
+        summary["load_event_saved_pct"] = round((cold - warm) / cold * 100, 1)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build a warmed Chrome profile template")
+    parser.add_argument("--template", default=os.getenv("BROWSER_PROFILE_TEMPLATE"),
+                        help="template directory (default: a temporary one)")
+    parser.add_argument("--measure", action="store_true",
+                        help="compare first-page load with an empty and a warmed profile")
+    parser.add_argument("--repeat", type=int, default=3, help="browser launches per profile when measuring")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.template:
+        template = ProfileTemplate(args.template)
+    else:
+        template = ProfileTemplate(tempfile.mkdtemp(prefix="behave-chrome-template-"), owned=True)
+    try:
+        if args.measure:
+            print(json.dumps(measure(template, args.repeat), indent=2))
+        else:
+            template.ensure()
+            print(template.path)
+    except WebDriverException as error:
+        logger.error("Chrome unavailable: %s", error.msg)
+        return 1
+    finally:
+        if args.measure:
+            template.close()
+        stop_shared_service()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
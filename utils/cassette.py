@@ -0,0 +1,228 @@
+"""
+Record/replay cassettes for the API HTTP client.
+
+In record mode every exchange made through HttpClient is sent for real and
+written to a compact JSON cassette. In replay mode responses come from the
+cassette and no sockets are opened, so step-logic and schema changes can be
+checked in milliseconds.
+
+Requests are matched on method, path and JSON body. Volatile values are
+normalised before matching: numeric path segments (booking IDs) become
+{id}, the host is ignored so a cassette recorded against one BASE_URL
+replays against another, and body fields listed in HTTP_CASSETTE_IGNORE are
+dropped. An exact match is preferred over a normalised one, matches are
+consumed in recorded order, and once a request's recordings are used up the
+last one is repeated. Exchanges are tagged with the scenario that made them,
+and recordings from the same scenario are tried first, so a cassette merged
+from parallel workers replays whatever order the scenarios run in.
+
+Environment:
+    HTTP_CASSETTE         cassette file; unset disables recording and replay
+    HTTP_CASSETTE_MODE    record, replay or auto (replay if the file exists)
+    HTTP_CASSETTE_MATCH   request parts to match on (default: method,path,body)
+    HTTP_CASSETTE_IGNORE  body fields to ignore when matching
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+MATCH_PARTS = ("method", "path", "body")
+ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+# Cassettes are shared per file so every client in the process records into,
+# and replays from, the same one
+_open_cassettes: Dict[str, "Cassette"] = {}
+_open_lock = threading.Lock()
+
+
+class CassetteMiss(Exception):
+    """A request in replay mode has no recorded exchange"""
+
+
+class Cassette:
+    """Records HTTP exchanges to a file or replays them from it"""
+
+    def __init__(self, path: str, mode: str = "auto", match_on=MATCH_PARTS, ignore_fields=()):
+        mode = resolve_mode(path, mode)
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.match_on = tuple(match_on)
+        self.ignore_fields = set(ignore_fields)
+        self.interactions = []
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._last = {}
+        self._scope = threading.local()
+        if mode == "replay":
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """Return the process-wide cassette configured by HTTP_CASSETTE, if any"""
+        path = os.getenv("HTTP_CASSETTE")
+        if not path:
+            return None
+        path = os.path.abspath(path)
+        with _open_lock:
+            if path not in _open_cassettes:
+                _open_cassettes[path] = cls(
+                    path,
+                    mode=os.getenv("HTTP_CASSETTE_MODE", "auto"),
+                    match_on=_split_env("HTTP_CASSETTE_MATCH") or MATCH_PARTS,
+                    ignore_fields=_split_env("HTTP_CASSETTE_IGNORE"),
+                )
+                logger.info("HTTP cassette %s in %s mode", path, _open_cassettes[path].mode)
+            return _open_cassettes[path]
+
+    def scope(self, scenario: Optional[str]) -> None:
+        """Tag the calling thread's exchanges with a scenario name, or stop tagging them"""
+        self._scope.scenario = scenario
+
+    def play(self, method: str, url: str, kwargs: dict,
+             send: Callable[[], requests.Response]) -> requests.Response:
+        """Replay the matching response, or send the request and record it"""
+        body = self._body(kwargs)
+        scenario = getattr(self._scope, "scenario", None)
+        if self.mode == "replay":
+            return self._replay(method, url, body, scenario)
+
+        response = send()
+        with self._lock:
+            self.interactions.append({
+                "scenario": scenario,
+                "request": {"method": method, "url": url, "body": body},
+                "response": {
+                    "status": response.status_code,
+                    "reason": response.reason,
+                    "headers": dict(response.headers),
+                    "body": response.text,
+                },
+            })
+        return response
+
+    def save(self) -> None:
+        """Write recorded exchanges to the cassette file (record mode only)"""
+        if self.mode != "record":
+            return
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": self.interactions}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        logger.info("Recorded %d HTTP exchanges to %s", len(data["interactions"]), self.path)
+
+    def _load(self) -> None:
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+        self.interactions = data["interactions"]
+        for index, interaction in enumerate(self.interactions):
+            request = interaction["request"]
+            scenario = interaction.get("scenario")
+            for exact in (True, False):
+                key = self._key(request["method"], request["url"], request["body"], exact)
+                self._queues.setdefault(key, []).append(index)
+                if scenario is not None:
+                    self._queues.setdefault((scenario,) + key, []).append(index)
+
+    def _replay(self, method: str, url: str, body, scenario: Optional[str]) -> requests.Response:
+        exact_key = self._key(method, url, body, exact=True)
+        loose_key = self._key(method, url, body, exact=False)
+        keys = [exact_key, loose_key]
+        if scenario is not None:
+            keys = [(scenario,) + exact_key, (scenario,) + loose_key] + keys
+        with self._lock:
+            index = None
+            for key in keys:
+                index = self._next(key)
+                if index is not None:
+                    break
+            if index is None:
+                index = self._last.get(loose_key)
+            if index is None:
+                raise CassetteMiss(f"No recorded response for {method} {url} in {self.path}")
+            self._last[loose_key] = index
+        return self._response(self.interactions[index]["response"], url)
+
+    def _next(self, key) -> Optional[int]:
+        """Pop the first unused recording for a key"""
+        queue = self._queues.get(key)
+        while queue:
+            index = queue.pop(0)
+            if not self.interactions[index].get("_used"):
+                self.interactions[index]["_used"] = True
+                return index
+        return None
+
+    def _key(self, method: str, url: str, body, exact: bool) -> tuple:
+        parts = urlsplit(url)
+        path = parts.path if exact else ID_SEGMENT.sub("/{id}", parts.path)
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        values = {"method": method.upper(), "path": path, "body": self._normalise_body(body)}
+        return tuple(values[part] for part in self.match_on)
+
+    def _normalise_body(self, body) -> str:
+        if isinstance(body, dict) and self.ignore_fields:
+            body = {key: value for key, value in body.items() if key not in self.ignore_fields}
+        return json.dumps(body, sort_keys=True)
+
+    @staticmethod
+    def _body(kwargs: dict):
+        if "json" in kwargs:
+            return kwargs["json"]
+        data = kwargs.get("data")
+        return data.decode() if isinstance(data, bytes) else data
+
+    @staticmethod
+    def _response(recorded: dict, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded.get("reason")
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = recorded["body"].encode("utf-8")  # pylint: disable=protected-access
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+
+def resolve_mode(path: str, mode: str) -> str:
+    """Mode a cassette at path opens in; auto replays an existing file and records otherwise"""
+    if mode == "auto":
+        return "replay" if os.path.exists(path) else "record"
+    return mode
+
+
+def merge_cassettes(cassette_paths: List[str], output_path: str) -> None:
+    """Combine cassettes recorded by parallel workers into one"""
+    interactions = []
+    for path in cassette_paths:
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                interactions.extend(json.load(f)["interactions"])
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({"version": CASSETTE_VERSION, "interactions": interactions}, f, separators=(",", ":"))
+    logger.info("Merged %d HTTP exchanges into %s", len(interactions), output_path)
+
+
+def _split_env(name: str) -> tuple:
+    return tuple(part.strip() for part in os.getenv(name, "").split(",") if part.strip())
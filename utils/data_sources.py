@@ -0,0 +1,129 @@
+"""
+Streamed external example data for data-driven scenarios.
+
+Instead of an Examples table, a scenario names a CSV or JSONL file in a step
+and loops over its rows. Rows are read one at a time while the step runs, so
+memory use and startup time don't depend on the file's size. Under the
+parallel runner, scenarios tagged @sharded run on every worker, and worker i
+of n takes rows i, i+n, i+2n, ... of the file.
+
+Rows are dicts of strings with the file's headings, like Gherkin table rows,
+so the payload builders in utils.booking_payloads accept them as they are.
+JSON values are converted the way they would be written in a table.
+
+Environment:
+    DATA_DIR        directory relative data file names are resolved against (default: features/data)
+    DATA_ROW_LIMIT  rows each worker takes at most, e.g. for a quick smoke run (default: all)
+"""
+
+import csv
+import itertools
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "features", "data")
+
+# Scenarios with this tag run on every parallel worker, each over its share of the rows
+SHARDED_TAG = "sharded"
+
+# Row failures kept for the assertion message; the rest are only counted
+MAX_REPORTED_FAILURES = 10
+
+
+def _cell(value) -> str:
+    """A JSON value as it would be written in a Gherkin table cell"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return ""
+    return str(value)
+
+
+def _csv_rows(f) -> Iterator[Dict[str, str]]:
+    for row in csv.DictReader(f):
+        yield {heading: (value or "").strip() for heading, value in row.items() if heading is not None}
+
+
+def _jsonl_rows(f) -> Iterator[Dict[str, str]]:
+    for line in f:
+        if line.strip():
+            yield {key: _cell(value) for key, value in json.loads(line).items()}
+
+
+READERS: Dict[str, Callable] = {
+    ".csv": _csv_rows,
+    ".jsonl": _jsonl_rows,
+    ".ndjson": _jsonl_rows,
+}
+
+
+def worker_shard() -> Tuple[int, int]:
+    """This process's worker index and the worker count, as set by utils.parallel_runner"""
+    return int(os.getenv("BEHAVE_WORKER_INDEX", "0")), int(os.getenv("BEHAVE_WORKER_COUNT", "1"))
+
+
+class DataSource:
+    """Lazily read rows of a CSV or JSONL file, limited to one worker's share"""
+
+    def __init__(self, path: str, index: int = 0, count: int = 1, limit: Optional[int] = None):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in READERS:
+            raise ValueError(f"Unsupported data file {path}, expected one of {', '.join(READERS)}")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Data file not found: {path}")
+        if not 0 <= index < count:
+            raise ValueError(f"Worker index {index} is outside the worker count {count}")
+        self.path = path
+        self.index = index
+        self.count = count
+        self.limit = limit
+        self._reader = READERS[extension]
+
+    @classmethod
+    def from_env(cls, name: str, tags=()) -> "DataSource":
+        """Source for a file under DATA_DIR, sharded across workers if the scenario is tagged @sharded"""
+        path = name if os.path.isabs(name) else os.path.join(os.getenv("DATA_DIR", DEFAULT_DATA_DIR), name)
+        index, count = worker_shard() if SHARDED_TAG in tags else (0, 1)
+        limit = os.getenv("DATA_ROW_LIMIT")
+        return cls(path, index, count, int(limit) if limit else None)
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """Yield (row number, row) for this worker's rows; numbers start at 1 after the headings"""
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            numbered = enumerate(self._reader(f), start=1)
+            rows = itertools.islice(numbered, self.index, None, self.count)
+            yield from itertools.islice(rows, self.limit)
+
+
+class RowResults:
+    """Pass/fail counts over streamed rows, keeping only the first few failures"""
+
+    def __init__(self, source: DataSource):
+        self.source = source
+        self.passed = 0
+        self.failed = 0
+        self.failures: List[str] = []
+
+    def record(self, number: int, error: Optional[str]) -> None:
+        if error is None:
+            self.passed += 1
+            return
+        self.failed += 1
+        if len(self.failures) < MAX_REPORTED_FAILURES:
+            self.failures.append(f"row {number}: {error}")
+
+    def assert_all_passed(self) -> None:
+        """Fail with the first few row errors if any row failed"""
+        shard = f" (worker {self.source.index + 1} of {self.source.count})" if self.source.count > 1 else ""
+        logger.info("%s%s: %d rows passed, %d failed", self.source.path, shard, self.passed, self.failed)
+        if self.passed + self.failed == 0:
+            logger.warning("No rows to check in %s%s", self.source.path, shard)
+        assert self.failed == 0, (
+            f"{self.failed} of {self.passed + self.failed} rows failed in {self.source.path}{shard}:\n"
+            + "\n".join(self.failures)
+            + ("\n..." if self.failed > len(self.failures) else "")
+        )
@@ -0,0 +1,166 @@
+"""
+WebDriver command recording and round-trip budgets.
+
+Wraps a driver's execute() so every command it sends to chromedriver,
+including those issued through WebElements, is recorded with its latency and
+the page-object method that caused it.
+
+Scenarios can cap their round trips with a @max-round-trips:N tag and page
+object methods with the @round_trip_budget(N) decorator. The command that
+goes over a budget raises RoundTripBudgetExceeded, listing the commands
+spent, so regressions such as an extra get_current_url() fail at the call.
+Fallback polling inside budget_exempt() is recorded but not charged.
+"""
+
+import functools
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Attribute marking a driver that already reports to a recorder
+ATTACHED_ATTRIBUTE = "_behave_command_recorder"
+
+# Scenario tag prefix declaring a round-trip budget, e.g. @max-round-trips:40
+ROUND_TRIP_BUDGET_TAG = "max-round-trips:"
+
+PAGES_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+
+# Busiest caller/command pairs listed in the end-of-run summary
+SUMMARY_SIZE = 10
+
+
+class RoundTripBudgetExceeded(AssertionError):
+    """A scenario or page-object method sent more WebDriver commands than its budget"""
+
+
+def scenario_budget(tags: Iterable[str]) -> Optional[int]:
+    """Round-trip budget declared by a @max-round-trips:N tag, if any"""
+    for tag in tags:
+        if tag.startswith(ROUND_TRIP_BUDGET_TAG):
+            return int(tag[len(ROUND_TRIP_BUDGET_TAG):])
+    return None
+
+
+def round_trip_budget(limit: int):
+    """Fail a page-object method that sends more than limit WebDriver commands"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            recorder = getattr(self.driver, ATTACHED_ATTRIBUTE, None)
+            if recorder is None:
+                return method(self, *args, **kwargs)
+            with recorder.budget(f"{type(self).__name__}.{method.__name__}", limit):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def budget_exempt(driver):
+    """Don't charge the block's commands to any budget, e.g. fallback polling"""
+    recorder = getattr(driver, ATTACHED_ATTRIBUTE, None)
+    if recorder is None:
+        yield
+        return
+    recorder.exempt_depth += 1
+    try:
+        yield
+    finally:
+        recorder.exempt_depth -= 1
+
+
+def _page_caller() -> Optional[str]:
+    """Outermost page-object method on the stack, as Class.method"""
+    caller = None
+    frame = sys._getframe(2)  # pylint: disable=protected-access
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(PAGES_DIRECTORY):
+            page = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            caller = f"{type(page).__name__}.{name}" if page is not None else name
+        frame = frame.f_back
+    return caller
+
+
+class CommandRecorder:
+    """Records the WebDriver commands sent by attached drivers and enforces budgets"""
+
+    def __init__(self):
+        self.count = 0
+        self.charged = 0
+        self.exempt_depth = 0
+        self.commands = []
+        self._totals = {}
+        self._budgets = []
+
+    def attach(self, driver):
+        """Record the driver's commands from now on; attaching twice is a no-op"""
+        if getattr(driver, ATTACHED_ATTRIBUTE, None) is self:
+            return driver
+        execute = driver.execute
+
+        def recorded_execute(driver_command, params=None):
+            caller = _page_caller()
+            self.count += 1
+            if not self.exempt_depth:
+                self.charged += 1
+                self._check_budgets(driver_command, caller)
+            started = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self._record(driver_command, caller, (time.perf_counter() - started) * 1000)
+
+        driver.execute = recorded_execute
+        setattr(driver, ATTACHED_ATTRIBUTE, self)
+        return driver
+
+    def start_scenario(self, name: str, limit: Optional[int] = None) -> None:
+        """Clear the per-scenario command log and apply the scenario's budget"""
+        self.commands = []
+        self._budgets = []
+        if limit is not None:
+            self._budgets.append((f"Scenario: {name}", limit, self.charged, 0))
+
+    def end_scenario(self) -> None:
+        """Drop the scenario's budget so browser resets are not charged to it"""
+        self._budgets = []
+
+    @contextmanager
+    def budget(self, label: str, limit: int):
+        """Fail any command inside the block that takes it over limit"""
+        entry = (label, limit, self.charged, len(self.commands))
+        self._budgets.append(entry)
+        try:
+            yield
+        finally:
+            if entry in self._budgets:
+                self._budgets.remove(entry)
+
+    def close(self) -> None:
+        """Log the callers that sent the most commands during the run"""
+        ranked = sorted(self._totals.items(), key=lambda item: item[1][0], reverse=True)
+        logger.info("WebDriver commands: %d sent", self.count)
+        for (caller, command), (count, total_ms) in ranked[:SUMMARY_SIZE]:
+            logger.info("  %5d x %-24s %-40s %8.1f ms", count, command, caller or "-", total_ms)
+
+    def _record(self, command: str, caller: Optional[str], latency_ms: float) -> None:
+        self.commands.append((command, caller, latency_ms))
+        totals = self._totals.setdefault((caller, command), [0, 0.0])
+        totals[0] += 1
+        totals[1] += latency_ms
+
+    def _check_budgets(self, command: str, caller: Optional[str]) -> None:
+        for label, limit, start_charged, start_index in self._budgets:
+            if self.charged - start_charged > limit:
+                spent = [f"{name} ({by or '-'})" for name, by, _ in self.commands[start_index:]]
+                spent.append(f"{command} ({caller or '-'})")
+                raise RoundTripBudgetExceeded(
+                    f"{label} exceeded its budget of {limit} WebDriver round trips: "
+                    + ", ".join(spent)
+                )
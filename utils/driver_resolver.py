@@ -0,0 +1,207 @@
+"""
+ChromeDriver binary resolution and a shared driver service.
+
+The chromedriver binary is resolved once per machine and recorded in an
+on-disk manifest keyed by the pinned version, so later runs, and parallel
+workers waiting on the same file lock, reuse it without touching the network.
+Unpinned ("latest") entries are refreshed after CHROMEDRIVER_MAX_AGE, falling
+back to the cached binary when offline.
+
+All browser launches share one running chromedriver process.
+
+Environment:
+    CHROMEDRIVER_PATH     use this binary and skip resolution
+    CHROMEDRIVER_VERSION  pin the driver version to download
+    CHROMEDRIVER_CACHE    cache directory (default: ~/.cache/behave-chromedriver)
+    CHROMEDRIVER_MAX_AGE  seconds before an unpinned driver is re-checked (default: 7 days)
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Optional
+
+from selenium.webdriver.chrome.service import Service
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "behave-chromedriver")
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+MANIFEST_NAME = "manifest.json"
+LATEST = "latest"
+VERSION_IN_PATH = re.compile(r"[\\/](\d+(?:\.\d+){2,3})[\\/]")
+
+# Previously the only fallback when webdriver_manager was not installed
+LEGACY_WINDOWS_PATH = "C:/Program Files/Google/Chrome/Driver/chromedriver.exe"
+
+
+class DriverResolver:
+    """Finds a chromedriver binary, downloading it at most once per machine and version"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, version: Optional[str] = None,
+                 max_age: float = DEFAULT_MAX_AGE, path: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_age = max_age
+        self.path = path
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+
+    @classmethod
+    def from_env(cls) -> "DriverResolver":
+        """Build a resolver from CHROMEDRIVER_PATH, _VERSION, _CACHE and _MAX_AGE"""
+        return cls(
+            cache_dir=os.getenv("CHROMEDRIVER_CACHE", DEFAULT_CACHE_DIR),
+            version=os.getenv("CHROMEDRIVER_VERSION") or None,
+            max_age=float(os.getenv("CHROMEDRIVER_MAX_AGE", DEFAULT_MAX_AGE)),
+            path=os.getenv("CHROMEDRIVER_PATH") or None,
+        )
+
+    def resolve(self) -> Optional[str]:
+        """Return the chromedriver path, or None to let Selenium Manager find one"""
+        if self.path:
+            return self.path
+
+        key = self.version or LATEST
+        entry = self._cached(self._read_manifest().get(key))
+        if entry is not None and not self._stale(key, entry):
+            return entry["path"]
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with file_lock(self.manifest_path):
+            # Another worker may have resolved it while we waited for the lock
+            manifest = self._read_manifest()
+            entry = self._cached(manifest.get(key))
+            if entry is not None and not self._stale(key, entry):
+                return entry["path"]
+
+            path = self._download()
+            if path is None:
+                if entry is not None:
+                    logger.info("Using cached chromedriver %s offline", entry["path"])
+                    return entry["path"]
+                return self._local_driver()
+
+            match = VERSION_IN_PATH.search(path)
+            manifest[key] = {
+                "path": path,
+                "version": match.group(1) if match else self.version,
+                "resolved_at": time.time(),
+            }
+            self._write_manifest(manifest)
+        logger.info("Resolved chromedriver %s", path)
+        return path
+
+    def _stale(self, key: str, entry: dict) -> bool:
+        return key == LATEST and time.time() - entry.get("resolved_at", 0) > self.max_age
+
+    @staticmethod
+    def _cached(entry: Optional[dict]) -> Optional[dict]:
+        if entry is None or not os.path.isfile(entry.get("path", "")):
+            return None
+        return entry
+
+    def _download(self) -> Optional[str]:
+        """Install the driver through webdriver_manager into the cache directory"""
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            from webdriver_manager.core.driver_cache import DriverCacheManager
+        except ImportError:
+            return None
+        try:
+            manager = ChromeDriverManager(
+                driver_version=self.version,
+                cache_manager=DriverCacheManager(root_dir=self.cache_dir),
+            )
+            return manager.install()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("chromedriver download failed: %s", error)
+            return None
+
+    @staticmethod
+    def _local_driver() -> Optional[str]:
+        path = shutil.which("chromedriver")
+        if path:
+            return path
+        if os.path.isfile(LEGACY_WINDOWS_PATH):
+            return LEGACY_WINDOWS_PATH
+        return None
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+class SharedService(Service):
+    """chromedriver service kept running across browser launches.
+
+    Each driver starts and stops the service around its session; only the
+    first start launches chromedriver and stops just release it. shutdown()
+    stops the process for real.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Re-entrant: a failed start() calls stop() while holding it
+        self._lock = threading.RLock()
+        self.process = None
+        self.sessions = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                super().start()
+            self.sessions += 1
+
+    def stop(self) -> None:
+        with self._lock:
+            self.sessions = max(0, self.sessions - 1)
+
+    def shutdown(self) -> None:
+        """Stop the chromedriver process"""
+        with self._lock:
+            if self.process is not None:
+                super().stop()
+                self.process = None
+
+    def __del__(self):
+        try:
+            self.shutdown()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def shared_chrome_service() -> SharedService:
+    """The process-wide chromedriver service, resolving the binary on first use"""
+    global _shared_service  # pylint: disable=global-statement
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = SharedService(executable_path=DriverResolver.from_env().resolve())
+        return _shared_service
+
+
+def stop_shared_service() -> None:
+    """Stop the shared chromedriver process, if one was started"""
+    global _shared_service  # pylint: disable=global-statement
+    with _shared_service_lock:
+        if _shared_service is not None:
+            _shared_service.shutdown()
+            _shared_service = None
@@ -0,0 +1,105 @@
+"""
+Shared HTTP client for the API steps.
+
+Wraps a single requests.Session so every request in a run goes over pooled
+keep-alive connections, with retry and timeout defaults configured once.
+When HTTP_CASSETTE is set, requests are recorded to or replayed from a
+cassette (see utils.cassette).
+"""
+
+import logging
+import os
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.cassette import Cassette
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+DEFAULT_TIMEOUT = 5
+
+
+class HttpClient:
+    """requests.Session with pool, retry and timeout settings and usage counters"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT, cassette: Optional[Cassette] = None):
+        self.timeout = timeout
+        self.cassette = cassette
+        self.requests_sent = 0
+        self.session = requests.Session()
+        # Only connection errors are retried, for every method including POST/PATCH: the
+        # request never reached the server. Read errors and error statuses are never retried.
+        retry = Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.1)
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+    @classmethod
+    def from_env(cls) -> "HttpClient":
+        """Build a client from HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_TIMEOUT and HTTP_CASSETTE"""
+        return cls(
+            pool_size=int(os.getenv("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE)),
+            retries=int(os.getenv("HTTP_RETRIES", DEFAULT_RETRIES)),
+            timeout=float(os.getenv("HTTP_TIMEOUT", DEFAULT_TIMEOUT)),
+            cassette=Cassette.from_env(),
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request over the shared session with the default timeout"""
+        kwargs.setdefault("timeout", self.timeout)
+        self.requests_sent += 1
+        if self.cassette is not None:
+            return self.cassette.play(
+                method, url, kwargs, lambda: self.session.request(method, url, **kwargs)
+            )
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    @property
+    def connections_opened(self) -> int:
+        """Connections opened by the pools that are still held by the session"""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    @property
+    def stats(self) -> dict:
+        """Request, opened-connection and reused-connection counters for the run"""
+        opened = self.connections_opened
+        return {
+            "requests": self.requests_sent,
+            "connections_opened": opened,
+            "connections_reused": max(0, self.requests_sent - opened),
+        }
+
+    def close(self) -> None:
+        """Close pooled connections, save any recorded cassette and log the run's counters"""
+        if self.cassette is not None:
+            self.cassette.save()
+        stats = self.stats
+        logger.info(
+            "HTTP client: %d requests, %d connections opened, %d reused",
+            stats["requests"], stats["connections_opened"], stats["connections_reused"],
+        )
+        self.session.close()
@@ -0,0 +1,276 @@
+"""
+Load generation mode for the booking API.
+
+Runs the create, read, update, partial update and delete flow from
+features/api.feature as N concurrent virtual users, building payloads from
+the feature's own tables, and prints throughput, per-endpoint latency
+percentiles and error rates as JSON.
+
+The same latency summaries back the API steps that assert latency SLAs on
+concurrent request bursts. With LATENCY_REPORT set, each burst's summary and
+histogram is appended to that file as a JSON line.
+
+Usage:
+    python -m utils.load_runner --users 20 --duration 60
+    python -m utils.load_runner --users 5 --iterations 100 --output load.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Callable, Dict, List, Optional
+
+from behave.parser import parse_file
+
+from utils.booking_payloads import (
+    booking_details_from_row,
+    booking_request_body,
+    partial_update_from_row,
+)
+from utils.file_lock import file_lock
+from utils.http_client import HttpClient
+from utils.token_cache import TokenCache
+
+logger = logging.getLogger(__name__)
+
+API_FEATURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "features", "api.feature")
+BOOKING_ENDPOINT = "booking"
+AUTH_ENDPOINT = "auth"
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+}
+
+# Upper bounds (ms) of the latency histogram buckets; slower samples go in the last, open bucket
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of the samples, or None if there are none"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_histogram(samples_ms: List[float]) -> Dict[str, int]:
+    """Sample counts per latency bucket, keyed by the bucket's upper bound"""
+    histogram = {f"<={bound}ms": 0 for bound in LATENCY_BUCKETS_MS}
+    histogram[f">{LATENCY_BUCKETS_MS[-1]}ms"] = 0
+    for sample in samples_ms:
+        bound = next((bound for bound in LATENCY_BUCKETS_MS if sample <= bound), None)
+        histogram[f"<={bound}ms" if bound is not None else f">{LATENCY_BUCKETS_MS[-1]}ms"] += 1
+    return histogram
+
+
+def latency_summary(samples_ms: List[float], errors: int = 0) -> dict:
+    """Count, error rate, latency percentiles (ms) and histogram for one endpoint"""
+    total = len(samples_ms)
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "mean_ms": sum(samples_ms) / total if total else None,
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "histogram": latency_histogram(samples_ms),
+    }
+
+
+def burst(send: Callable[[], bool], requests: int, clients: int) -> dict:
+    """Call send requests times from concurrent clients and summarise the latencies.
+
+    send returns whether the response was the expected one; exceptions count
+    as errors. The summary also carries the raw samples for percentile checks.
+    """
+    def timed(_):
+        started = time.perf_counter()
+        try:
+            ok = send()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.debug("Burst request failed: %s", error)
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    samples = [latency for latency, _ in results]
+    summary = latency_summary(samples, sum(1 for _, ok in results if not ok))
+    summary.update(clients=clients, elapsed_s=elapsed, throughput_rps=requests / elapsed if elapsed else 0.0)
+    summary["samples_ms"] = samples
+    return summary
+
+
+def record_burst(record: dict, path: Optional[str] = None) -> None:
+    """Append a burst's summary as a JSON line to LATENCY_REPORT, which parallel workers share"""
+    path = path or os.getenv("LATENCY_REPORT")
+    if not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with file_lock(path):
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def load_feature_payloads(path: str = API_FEATURE) -> dict:
+    """Build create, update and partial update payloads from the feature's tables"""
+    feature = parse_file(path)
+    tables = {}
+    steps = chain(feature.background.steps, *(scenario.steps for scenario in feature.scenarios))
+    for step in steps:
+        if step.table:
+            tables.setdefault(step.name, step.table[0])
+
+    return {
+        "create": booking_request_body(
+            booking_details_from_row(tables["I have a new hotel booking with the following details"])
+        ),
+        "update": booking_request_body(booking_details_from_row(tables["I have updated booking details"])),
+        "partial": partial_update_from_row(tables["I want to update specific booking details"]),
+    }
+
+
+class LoadRunner:
+    """Drives the booking CRUD flow from concurrent virtual users"""
+
+    def __init__(self, base_url: str, username: str, password: str, users: int):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.users = users
+        self.payloads = load_feature_payloads()
+        self.http = HttpClient(pool_size=users, retries=0)
+        self.token_cache = TokenCache.from_env()
+
+    def run(self, duration: Optional[float] = None, iterations: Optional[int] = None) -> dict:
+        """Run every virtual user until the duration elapses or it completes its iterations"""
+        # Authenticate up front so a bad target fails fast instead of per user
+        self._token()
+        deadline = time.perf_counter() + duration if duration else None
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.users) as executor:
+            futures = [
+                executor.submit(self._virtual_user, deadline, iterations)
+                for _ in range(self.users)
+            ]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+        self.http.close()
+
+        latencies: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        for user_latencies, user_errors in results:
+            for endpoint, samples in user_latencies.items():
+                latencies.setdefault(endpoint, []).extend(samples)
+            for endpoint, count in user_errors.items():
+                errors[endpoint] = errors.get(endpoint, 0) + count
+
+        total_requests = sum(len(samples) for samples in latencies.values())
+        total_errors = sum(errors.values())
+        return {
+            "virtual_users": self.users,
+            "elapsed_s": elapsed,
+            "requests": total_requests,
+            "throughput_rps": total_requests / elapsed if elapsed else 0.0,
+            "error_rate": total_errors / total_requests if total_requests else 0.0,
+            "endpoints": {
+                endpoint: latency_summary(samples, errors.get(endpoint, 0))
+                for endpoint, samples in sorted(latencies.items())
+            },
+        }
+
+    def _token(self) -> str:
+        return self.token_cache.get_or_fetch(self.base_url, self.username, self._request_token)
+
+    def _request_token(self) -> str:
+        response = self.http.post(
+            f"{self.base_url}{AUTH_ENDPOINT}",
+            headers=HEADERS,
+            json={"username": self.username, "password": self.password},
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Authentication failed: {response.status_code} - {response.text}")
+        return response.json()["token"]
+
+    def _virtual_user(self, deadline: Optional[float], iterations: Optional[int]):
+        latencies: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+
+        def call(endpoint, method, url, expected_status, **kwargs):
+            started = time.perf_counter()
+            try:
+                response = self.http.request(method, url, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.debug("%s failed: %s", endpoint, error)
+                response = None
+            latencies.setdefault(endpoint, []).append((time.perf_counter() - started) * 1000)
+            if response is None or response.status_code != expected_status:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+                if response is not None and response.status_code == 403:
+                    self.token_cache.invalidate(self.base_url, self.username)
+                return None
+            return response
+
+        completed = 0
+        while (iterations is None or completed < iterations) and \
+                (deadline is None or time.perf_counter() < deadline):
+            completed += 1
+            auth_headers = {**HEADERS, "Cookie": f"token={self._token()}"}
+            collection_url = f"{self.base_url}{BOOKING_ENDPOINT}"
+
+            created = call("POST /booking", "POST", collection_url, 200,
+                           headers=HEADERS, json=self.payloads["create"])
+            if created is None:
+                continue
+            booking_url = f"{collection_url}/{created.json()['bookingid']}"
+
+            call("GET /booking/{id}", "GET", booking_url, 200, headers=HEADERS)
+            call("PUT /booking/{id}", "PUT", booking_url, 200,
+                 headers=auth_headers, json=self.payloads["update"])
+            call("PATCH /booking/{id}", "PATCH", booking_url, 200,
+                 headers=auth_headers, json=self.payloads["partial"])
+            call("DELETE /booking/{id}", "DELETE", booking_url, 201, headers=auth_headers)
+
+        return latencies, errors
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate load with the api.feature booking flow")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, help="seconds to run for")
+    parser.add_argument("--iterations", type=int, help="flows per virtual user")
+    parser.add_argument("--base-url", default=os.getenv("BASE_URL", "http://localhost:3001/"))
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.iterations is None:
+        parser.error("one of --duration or --iterations is required")
+
+    logging.basicConfig(level=logging.INFO)
+    runner = LoadRunner(args.base_url, args.username, args.password, max(1, args.users))
+    results = runner.run(duration=args.duration, iterations=args.iterations)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
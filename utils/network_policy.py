@@ -0,0 +1,125 @@
+"""
+Network resource blocking and cache control for UI scenarios.
+
+Functional UI scenarios don't assert on images, fonts or third-party
+requests, so by default Chrome is told not to fetch them with the DevTools
+Network.setBlockedURLs command. Scenarios tagged @performance (or
+@network:full) keep full loading so their timings stay realistic.
+
+Per-scenario tags adjust the blocklist:
+    @block:<group or pattern>   also block, e.g. @block:*.css
+    @allow:<group or pattern>   remove from the blocklist, e.g. @allow:images
+    @network:full               block nothing
+    @cache:cold                 clear the browser cache before the scenario
+    @cache:disabled             disable the HTTP cache for the scenario
+
+Chrome's blocklist has no exceptions, so an allow entry removes a group or
+an identical pattern from the blocklist rather than punching a hole in it.
+
+Environment:
+    NETWORK_BLOCK  default blocked groups or patterns (default: images,fonts,media,third-party; empty blocks nothing)
+    NETWORK_ALLOW  groups or patterns never blocked (default: none)
+    NETWORK_CACHE  default cache mode: enabled, cold or disabled (default: enabled)
+"""
+
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Resource groups usable in NETWORK_BLOCK, NETWORK_ALLOW and @block:/@allow: tags
+RESOURCE_GROUPS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg"],
+    "third-party": [
+        "*backtrace.io*",
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+    ],
+}
+DEFAULT_BLOCK = "images,fonts,media,third-party"
+
+FULL_LOADING_TAGS = ("performance", "network:full")
+BLOCK_TAG = "block:"
+ALLOW_TAG = "allow:"
+CACHE_TAG = "cache:"
+CACHE_MODES = ("enabled", "cold", "disabled")
+
+# Attribute recording the (blocked, cache disabled) state last sent to a driver
+APPLIED_ATTRIBUTE = "_behave_network_policy"
+
+
+def expand(entries: Iterable[str]) -> List[str]:
+    """URL patterns for a mix of group names and patterns, in order, without duplicates"""
+    patterns = []
+    for entry in entries:
+        for pattern in RESOURCE_GROUPS.get(entry, [entry]):
+            if pattern and pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+def _split(value: str) -> List[str]:
+    return [entry.strip() for entry in value.split(",") if entry.strip()]
+
+
+class NetworkPolicy:
+    """Default blocklist, allowlist and cache mode, adjusted per scenario by tags"""
+
+    def __init__(self, block: Iterable[str] = (), allow: Iterable[str] = (), cache: str = "enabled"):
+        if cache not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {cache!r}, expected one of {', '.join(CACHE_MODES)}")
+        self.block = list(block)
+        self.allow = list(allow)
+        self.cache = cache
+        self._cdp_available = True
+
+    @classmethod
+    def from_env(cls) -> "NetworkPolicy":
+        """Build the default policy from NETWORK_BLOCK, NETWORK_ALLOW and NETWORK_CACHE"""
+        return cls(
+            block=_split(os.getenv("NETWORK_BLOCK", DEFAULT_BLOCK)),
+            allow=_split(os.getenv("NETWORK_ALLOW", "")),
+            cache=os.getenv("NETWORK_CACHE", "enabled"),
+        )
+
+    def for_tags(self, tags: Iterable[str]) -> Tuple[List[str], str]:
+        """Blocked URL patterns and cache mode for a scenario with these tags"""
+        tags = list(tags)
+        block = [] if any(tag in FULL_LOADING_TAGS for tag in tags) else list(self.block)
+        block += [tag[len(BLOCK_TAG):] for tag in tags if tag.startswith(BLOCK_TAG)]
+        allowed = set(expand([*self.allow, *(tag[len(ALLOW_TAG):] for tag in tags if tag.startswith(ALLOW_TAG))]))
+        cache = next((tag[len(CACHE_TAG):] for tag in tags if tag.startswith(CACHE_TAG)), self.cache)
+        if cache not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode in @{CACHE_TAG}{cache}, expected one of {', '.join(CACHE_MODES)}")
+        return [pattern for pattern in expand(block) if pattern not in allowed], cache
+
+    def apply(self, driver, tags: Iterable[str]) -> Optional[List[str]]:
+        """Send the scenario's blocklist and cache settings to the browser.
+
+        Commands are only sent when the settings differ from what the pooled
+        browser already has. Returns the blocked patterns, or None if the
+        browser does not support the DevTools Protocol.
+        """
+        blocked, cache = self.for_tags(tags)
+        if not self._cdp_available:
+            return None
+        state = (tuple(blocked), cache == "disabled")
+        try:
+            if getattr(driver, APPLIED_ATTRIBUTE, None) != state:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+                driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": cache == "disabled"})
+                setattr(driver, APPLIED_ATTRIBUTE, state)
+            if cache == "cold":
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except (AttributeError, WebDriverException) as error:
+            logger.warning("Network policy unavailable, loading every resource: %s", error)
+            self._cdp_available = False
+            return None
+        return blocked
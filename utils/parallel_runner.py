@@ -0,0 +1,301 @@
+"""
+Parallel scenario runner.
+
+Splits the selected scenarios (one entry per Scenario Outline row) across N
+behave worker processes and merges their results into a single JSON report.
+Scenarios are assigned longest-first to the least-loaded worker using their
+durations from past runs (see utils.scenario_durations), so all workers
+finish close together, and this run's durations are recorded for the next.
+Scenarios tagged @sharded run on every worker over a share of their
+streamed data rows (see utils.data_sources).
+
+Usage:
+    python -m utils.parallel_runner --workers 8 --tags=@ui --tags=~@skip-ci
+    python -m utils.parallel_runner --changed-since origin/main
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from behave.parser import parse_file
+from behave.tag_expression import TagExpression
+
+from utils.cassette import merge_cassettes, resolve_mode
+from utils.data_sources import SHARDED_TAG
+from utils.scenario_durations import DurationStore, report_durations, scenario_steps
+from utils.step_trace import merge_traces
+from utils.test_selection import relative, scenario_key, select_scenarios
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURES = "features/*.feature"
+DEFAULT_REPORT_DIR = "reports"
+
+
+def collect_scenarios(paths: List[str], tags: List[str]) -> list:
+    """Return every scenario matching the tag expression"""
+    tag_expression = TagExpression(tags)
+    scenarios = []
+    for path in paths:
+        feature = parse_file(path)
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            if tag_expression.check(scenario.effective_tags):
+                scenarios.append(scenario)
+    return scenarios
+
+
+def scenario_location(scenario) -> str:
+    """file:line location behave accepts to run a single scenario"""
+    return f"{scenario.location.filename}:{scenario.location.line}"
+
+
+def affected_scenarios(scenarios: list, base: str, coverage_map: Optional[str] = None) -> list:
+    """Keep only the scenarios affected by changes since the base revision"""
+    selection = select_scenarios(base, coverage_map)
+    if selection.run_all:
+        logger.info("Every scenario is affected: %s changed", selection.reasons["*"])
+        return scenarios
+    selected = set(selection.locations)
+    affected = [
+        scenario for scenario in scenarios
+        if f"{relative(scenario.location.filename)}:{scenario.location.line}" in selected
+    ]
+    logger.info("%d of %d scenarios affected by changes since %s", len(affected), len(scenarios), base)
+    return affected
+
+
+def schedule_scenarios(scenarios: list, workers: int, durations: DurationStore) -> List[List[str]]:
+    """Assign scenarios longest-first to the least-loaded worker (LPT scheduling).
+
+    @sharded scenarios go to every worker, each streaming its share of the data rows.
+    """
+    estimates = [
+        (durations.estimate(scenario_key(scenario), scenario.effective_tags, scenario_steps(scenario)),
+         scenario_location(scenario), SHARDED_TAG in scenario.effective_tags)
+        for scenario in scenarios
+    ]
+    estimates.sort(key=lambda estimate: -estimate[0])
+    # A sharded scenario's recorded duration is one worker's share, added to every worker
+    shared = sum(seconds for seconds, _, sharded in estimates if sharded)
+    loads = [(shared, index) for index in range(workers)]
+    shards = [[location for _, location, sharded in estimates if sharded] for _ in range(workers)]
+    for seconds, location, sharded in estimates:
+        if sharded:
+            continue
+        load, index = heapq.heappop(loads)
+        shards[index].append(location)
+        heapq.heappush(loads, (load + seconds, index))
+    logger.info("Estimated worker loads: %s seconds",
+                ", ".join(f"{load:.1f}" for load, _ in sorted(loads, key=lambda entry: entry[1])))
+    return [shard for shard in shards if shard]
+
+
+def record_durations(report_path: str, scenarios: list, durations: DurationStore) -> None:
+    """Store how long each scenario in the merged report took"""
+    with open(report_path, "r") as f:
+        measured = report_durations(json.load(f))
+    by_location = {
+        f"{relative(scenario.location.filename)}:{scenario.location.line}": scenario
+        for scenario in scenarios
+    }
+    for location, seconds in measured.items():
+        path, line = location.rsplit(":", 1)
+        scenario = by_location.get(f"{relative(path)}:{line}")
+        if scenario is not None:
+            durations.record(scenario_key(scenario), scenario.effective_tags, scenario_steps(scenario), seconds)
+    durations.save()
+
+
+def worker_env(index: int, count: int, report_dir: str) -> Dict[str, str]:
+    """Environment for one worker, with its own BASE_URL if BASE_URLS is set"""
+    env = dict(os.environ)
+    env["BEHAVE_WORKER_INDEX"] = str(index)
+    env["BEHAVE_WORKER_COUNT"] = str(count)
+    # One token cache file per run, shared by all of its workers
+    env.setdefault("AUTH_TOKEN_CACHE", os.path.join(os.path.abspath(report_dir), "auth-tokens.json"))
+    if env.get("STEP_TRACE"):
+        # Each worker traces to its own file, merged into STEP_TRACE afterwards
+        env["STEP_TRACE"] = trace_path(report_dir, index)
+    if recorded_cassette():
+        # Each worker records its own cassette, merged into HTTP_CASSETTE afterwards
+        env["HTTP_CASSETTE"] = cassette_path(report_dir, index)
+        env["HTTP_CASSETTE_MODE"] = "record"
+    template = profile_template_path(report_dir)
+    if template:
+        # The first worker to launch Chrome warms the profile, the rest copy it
+        env["BROWSER_PROFILE_TEMPLATE"] = template
+    base_urls = [url.strip() for url in env.get("BASE_URLS", "").split(",") if url.strip()]
+    if base_urls:
+        env["BASE_URL"] = base_urls[index % len(base_urls)]
+    return env
+
+
+def profile_template_path(report_dir: str) -> Optional[str]:
+    """Warmed browser profile shared by this run's workers, or None if warming is off or a template is given"""
+    if os.getenv("BROWSER_PROFILE_TEMPLATE"):
+        return None
+    if os.getenv("BROWSER_PROFILE_WARMUP", "").lower() not in ("1", "true", "yes"):
+        return None
+    return os.path.join(os.path.abspath(report_dir), "profile-template")
+
+
+def recorded_cassette() -> Optional[str]:
+    """HTTP_CASSETTE if this run records it rather than replaying it"""
+    path = os.getenv("HTTP_CASSETTE")
+    if path and resolve_mode(path, os.getenv("HTTP_CASSETTE_MODE", "auto")) == "record":
+        return path
+    return None
+
+
+def cassette_path(report_dir: str, index: int) -> str:
+    """HTTP cassette recorded by one worker"""
+    return os.path.join(os.path.abspath(report_dir), f"cassette-{index}.json")
+
+
+def trace_path(report_dir: str, index: int) -> str:
+    """Step trace file written by one worker"""
+    return os.path.join(os.path.abspath(report_dir), f"trace-{index}.json")
+
+
+def run_workers(shards: List[List[str]], tags: List[str], report_dir: str) -> List[str]:
+    """Start one behave process per shard and wait for all of them.
+
+    Returns the report paths; raises RuntimeError if a worker died without
+    writing its report, so its scenarios are never silently dropped.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    processes = []
+    for index, shard in enumerate(shards):
+        report_path = os.path.join(report_dir, f"worker-{index}.json")
+        log_path = os.path.join(report_dir, f"worker-{index}.log")
+        command = [
+            sys.executable, "-m", "behave",
+            "--no-capture", "-f", "json", "-o", report_path,
+            "-f", "progress", "-o", log_path,
+        ]
+        command += [f"--tags={tag}" for tag in tags]
+        command += shard
+        process = subprocess.Popen(
+            command,
+            env=worker_env(index, len(shards), report_dir),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+        )
+        processes.append((process, report_path))
+        logger.info("Worker %d started with %d scenarios", index, len(shard))
+
+    report_paths = []
+    for index, (process, report_path) in enumerate(processes):
+        returncode = process.wait()
+        if not os.path.exists(report_path) or os.path.getsize(report_path) == 0:
+            raise RuntimeError(
+                f"Worker {index} exited with {returncode} without a report, "
+                f"see {report_path[:-len('.json')]}.log"
+            )
+        report_paths.append(report_path)
+    return report_paths
+
+
+def merge_reports(report_paths: List[str], output_path: str) -> Dict[str, int]:
+    """Combine worker JSON reports into one and count scenario results.
+
+    Every worker reports the whole feature with the scenarios it did not run
+    marked as skipped, so for each location the entry that actually ran wins.
+    A @sharded scenario runs on every worker, and a failed shard wins.
+    """
+    features = {}
+    for path in report_paths:
+        with open(path, "r") as f:
+            for feature in json.load(f):
+                merged = features.setdefault(feature["location"], dict(feature, elements={}))
+                if feature.get("status") == "failed":
+                    merged["status"] = "failed"
+                for element in feature.get("elements", []):
+                    current = merged["elements"].get(element["location"])
+                    if current is None or current.get("status") == "skipped" or element.get("status") == "failed":
+                        merged["elements"][element["location"]] = element
+
+    summary = {"passed": 0, "failed": 0, "skipped": 0}
+    for feature in features.values():
+        feature["elements"] = list(feature["elements"].values())
+        for element in feature["elements"]:
+            if element.get("type") != "scenario":
+                continue
+            status = element.get("status") or "skipped"
+            status = status if status in summary else "failed"
+            summary[status] += 1
+
+    with open(output_path, "w") as f:
+        json.dump(list(features.values()), f, indent=2)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run behave scenarios across worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--tags", action="append", default=[],
+                        help="behave tag expression, may be repeated")
+    parser.add_argument("--report-dir", default=DEFAULT_REPORT_DIR,
+                        help="directory for worker logs and the merged report")
+    parser.add_argument("--changed-since", metavar="REVISION",
+                        help="only run scenarios affected by changes since this git revision")
+    parser.add_argument("--coverage-map", default=os.getenv("SCENARIO_COVERAGE_MAP"),
+                        help="recorded coverage map used with --changed-since")
+    parser.add_argument("paths", nargs="*", help="feature files (default: features/*.feature)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    paths = args.paths or sorted(glob.glob(DEFAULT_FEATURES))
+    scenarios = collect_scenarios(paths, args.tags)
+    if args.changed_since:
+        scenarios = affected_scenarios(scenarios, args.changed_since, args.coverage_map)
+    if not scenarios:
+        logger.info("No scenarios selected")
+        return 0
+
+    durations = DurationStore.from_env(args.report_dir)
+    shards = schedule_scenarios(scenarios, max(1, args.workers), durations)
+    logger.info("Running %d scenarios on %d workers", len(scenarios), len(shards))
+    template = profile_template_path(args.report_dir)
+    if template:
+        # Warm the profile once per run rather than reusing a previous run's
+        shutil.rmtree(template, ignore_errors=True)
+    # Decided before the workers start, since in auto mode the merged file decides it afterwards
+    cassette = recorded_cassette()
+    worker_cassettes = [cassette_path(args.report_dir, index) for index in range(len(shards))]
+    if cassette:
+        for path in worker_cassettes:
+            if os.path.exists(path):
+                os.remove(path)
+    try:
+        report_paths = run_workers(shards, args.tags, args.report_dir)
+    finally:
+        if template:
+            shutil.rmtree(template, ignore_errors=True)
+
+    report_path = os.path.join(args.report_dir, "report.json")
+    summary = merge_reports(report_paths, report_path)
+    record_durations(report_path, scenarios, durations)
+    logger.info("%d scenarios passed, %d failed, %d skipped",
+                summary["passed"], summary["failed"], summary["skipped"])
+    if os.getenv("STEP_TRACE"):
+        merge_traces([trace_path(args.report_dir, index) for index in range(len(shards))],
+                     os.getenv("STEP_TRACE"))
+    if cassette:
+        merge_cassettes(worker_cassettes, cassette)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Historical scenario durations for scheduling parallel runs.
+
+Keeps the last few durations of each scenario (one entry per Scenario
+Outline row, keyed by file and name so line changes don't lose history) in
+a local JSON store, and estimates scenarios that have none from their tags:
+the seconds per step that scenarios with the same tags took in past runs,
+or a per-tag default, times the scenario's step count.
+
+Environment:
+    SCENARIO_DURATIONS  store file (default: durations.json in the report directory)
+"""
+
+import json
+import logging
+import os
+import statistics
+from typing import Dict, Iterable, List, Optional
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT = 1
+
+# Durations kept per scenario; the estimate is their median
+HISTORY_SIZE = 5
+
+# Seconds per step when no scenario with the tag has history; the slowest tag wins
+TAG_SECONDS_PER_STEP = {
+    "api": 0.05,
+    "ui": 1.0,
+    "performance": 3.0,
+    "glitch-user": 3.0,
+}
+DEFAULT_SECONDS_PER_STEP = 0.5
+
+
+def scenario_steps(scenario) -> int:
+    """Steps a scenario runs, including its feature's Background"""
+    background = scenario.feature.background if scenario.feature else None
+    return len(scenario.steps) + (len(background.steps) if background else 0)
+
+
+def report_durations(report: List[dict]) -> Dict[str, float]:
+    """Seconds each passed scenario took in a behave JSON report, by location.
+
+    Failed scenarios usually stop early, so their durations would skew the history.
+    """
+    durations = {}
+    for feature in report:
+        for element in feature.get("elements", []):
+            if element.get("type") != "scenario" or element.get("status") != "passed":
+                continue
+            results = [step["result"] for step in element.get("steps", []) if "result" in step]
+            durations[element["location"]] = sum(result.get("duration", 0.0) for result in results)
+    return durations
+
+
+class DurationStore:
+    """Recent per-scenario durations and tag-based estimates for scenarios without history"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.scenarios: Dict[str, dict] = self._load()
+        self._rates: Dict[str, Optional[float]] = {}
+
+    @classmethod
+    def from_env(cls, report_dir: str) -> "DurationStore":
+        """Store at SCENARIO_DURATIONS, or durations.json in the report directory"""
+        return cls(os.getenv("SCENARIO_DURATIONS") or os.path.join(report_dir, "durations.json"))
+
+    def estimate(self, key: str, tags: Iterable[str], steps: int) -> float:
+        """Median recorded seconds for the scenario, or an estimate from its tags"""
+        entry = self.scenarios.get(key)
+        if entry and entry["durations"]:
+            return statistics.median(entry["durations"])
+        return max(steps, 1) * self.seconds_per_step(tags)
+
+    def seconds_per_step(self, tags: Iterable[str]) -> float:
+        """Slowest per-step rate among the tags, learned from history where possible"""
+        rates = []
+        for tag in tags:
+            rate = self._learned_rate(tag)
+            if rate is None:
+                rate = TAG_SECONDS_PER_STEP.get(tag)
+            if rate is not None:
+                rates.append(rate)
+        return max(rates) if rates else DEFAULT_SECONDS_PER_STEP
+
+    def record(self, key: str, tags: Iterable[str], steps: int, seconds: float) -> None:
+        entry = self.scenarios.setdefault(key, {"durations": []})
+        entry["durations"] = (entry["durations"] + [round(seconds, 4)])[-HISTORY_SIZE:]
+        entry["tags"] = sorted(tags)
+        entry["steps"] = steps
+        self._rates = {}
+
+    def save(self) -> None:
+        """Merge into the store on disk, which concurrent runs may share"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with file_lock(self.path):
+            merged = self._load()
+            merged.update(self.scenarios)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"format": STORE_FORMAT, "scenarios": merged}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def _learned_rate(self, tag: str) -> Optional[float]:
+        if tag in self._rates:
+            return self._rates[tag]
+        rates = [
+            statistics.median(entry["durations"]) / max(entry.get("steps", 1), 1)
+            for entry in self.scenarios.values()
+            if entry["durations"] and tag in entry.get("tags", ())
+        ]
+        self._rates[tag] = statistics.median(rates) if rates else None
+        return self._rates[tag]
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning("Ignoring unreadable duration store %s: %s", self.path, error)
+            return {}
+        if data.get("format") != STORE_FORMAT:
+            return {}
+        return data.get("scenarios", {})
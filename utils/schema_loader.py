@@ -1,12 +1,55 @@
 import json
 import os
+from functools import lru_cache
 
+from jsonschema.validators import validator_for
+from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT202012
 
+SCHEMA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "schemas")
+
+
+@lru_cache(maxsize=None)
 def load_schema(schema_filename):
-    script_directory = os.path.dirname(os.path.abspath(__file__))
-    schema_directory = os.path.join(script_directory, "..", "schemas")
-    schema_path = os.path.join(schema_directory, schema_filename)
+    schema_path = os.path.join(SCHEMA_DIRECTORY, schema_filename)
 
     with open(schema_path, "r") as f:
         schema = json.load(f)
     return schema
+
+
+class SchemaRegistry:
+    """Loads every schema once and keeps a compiled validator per schema file.
+
+    Schemas are registered under their file name, so a schema can reference
+    another one with e.g. {"$ref": "booking_schema.json"}.
+    """
+
+    def __init__(self, schema_directory=SCHEMA_DIRECTORY):
+        schemas = {}
+        for filename in sorted(os.listdir(schema_directory)):
+            if filename.endswith(".json"):
+                with open(os.path.join(schema_directory, filename), "r") as f:
+                    schemas[filename] = json.load(f)
+
+        registry = Registry().with_resources(
+            (name, Resource.from_contents(schema, default_specification=DRAFT202012))
+            for name, schema in schemas.items()
+        )
+        self.validators = {}
+        for name, schema in schemas.items():
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            self.validators[name] = validator_class(
+                schema,
+                registry=registry,
+                format_checker=validator_class.FORMAT_CHECKER,
+            )
+
+    def validate(self, name, instance):
+        """Validate instance against a schema file, raising ValidationError on failure"""
+        try:
+            validator = self.validators[name]
+        except KeyError:
+            raise KeyError(f"Unknown schema: {name}") from None
+        validator.validate(instance)
@@ -0,0 +1,60 @@
+"""
+Authenticated session cache for UI scenarios.
+
+Holds the cookies and localStorage captured after one real UI login per user,
+so later scenarios in the same worker can inject them instead of driving the
+login form again.
+"""
+
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Scenarios tagged with this always log in through the UI
+UI_LOGIN_TAG = "ui-login"
+
+# Sessions whose cookies expire within this many seconds are not reused
+EXPIRY_MARGIN = 30
+
+
+class SessionCache:
+    """Per-worker store of captured login sessions keyed by username"""
+
+    def __init__(self):
+        self._sessions = {}
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.ui_logins = 0
+
+    def get(self, username: str) -> Optional[dict]:
+        """Return the captured session for a user, unless missing or about to expire"""
+        session = self._sessions.get(username)
+        if session is not None:
+            expiries = [cookie["expiry"] for cookie in session["cookies"] if "expiry" in cookie]
+            if expiries and min(expiries) < time.time() + EXPIRY_MARGIN:
+                self._sessions.pop(username)
+                session = None
+        if session is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return session
+
+    def put(self, username: str, session: dict) -> None:
+        """Store a session captured after a successful UI login"""
+        self._sessions[username] = session
+        # Every UI login ends here, including @ui-login scenarios that never call get()
+        self.ui_logins += 1
+
+    def invalidate(self, username: str) -> None:
+        """Forget a session that the app no longer accepts"""
+        if self._sessions.pop(username, None) is not None:
+            self.rejected += 1
+
+    def close(self) -> None:
+        """Log how many logins were injected and how many went through the UI"""
+        logger.info("Session cache: %d injected logins, %d UI logins (%d cache misses, %d rejected sessions)",
+                    self.hits - self.rejected, self.ui_logins, self.misses, self.rejected)
@@ -0,0 +1,86 @@
+"""
+Per-step timing exported as Chrome trace events.
+
+Records a complete ("X") event for every feature, scenario and step with its
+wall time and the WebDriver commands and HTTP requests it issued. The output
+opens in chrome://tracing or https://ui.perfetto.dev; each parallel worker is
+its own process row.
+
+Enable it with STEP_TRACE=trace.json.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _now_us() -> int:
+    # Wall clock, so traces from parallel workers line up when merged
+    return time.time_ns() // 1000
+
+
+class StepTracer:
+    """Collects trace events for one behave process"""
+
+    def __init__(self, path: str, counters: Callable[[], Dict[str, int]], pid: int = 0):
+        self.path = path
+        self.counters = counters
+        self.pid = pid
+        self.tid = threading.get_ident()
+        self.events: List[dict] = [{
+            "name": "process_name", "ph": "M", "pid": pid, "tid": self.tid,
+            "args": {"name": f"behave worker {pid}"},
+        }]
+        self._open = {}
+
+    @classmethod
+    def from_env(cls, counters: Callable[[], Dict[str, int]]) -> Optional["StepTracer"]:
+        """Build a tracer writing to STEP_TRACE, or None if it is unset"""
+        path = os.getenv("STEP_TRACE")
+        if not path:
+            return None
+        return cls(path, counters, pid=int(os.getenv("BEHAVE_WORKER_INDEX", "0")))
+
+    def begin(self, item) -> None:
+        """Mark the start of a feature, scenario or step"""
+        self._open[id(item)] = (_now_us(), self.counters())
+
+    def end(self, item, name: str, category: str, **args) -> None:
+        """Record the finished item as a complete event with its counter deltas"""
+        started = self._open.pop(id(item), None)
+        if started is None:
+            return
+        start_us, start_counters = started
+        end_counters = self.counters()
+        for counter, value in end_counters.items():
+            args[counter] = value - start_counters.get(counter, 0)
+        self.events.append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": start_us, "dur": _now_us() - start_us,
+            "pid": self.pid, "tid": self.tid, "args": args,
+        })
+
+    def write(self) -> None:
+        """Write the collected events as a Chrome trace file"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        logger.info("Wrote %d trace events to %s", len(self.events), self.path)
+
+
+def merge_traces(trace_paths: List[str], output_path: str) -> None:
+    """Combine per-worker trace files into one"""
+    events = []
+    for path in trace_paths:
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                events.extend(json.load(f)["traceEvents"])
+    with open(output_path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
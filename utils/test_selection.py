@@ -0,0 +1,569 @@
+"""
+Change-aware scenario selection.
+
+Maps source files to the scenarios that depend on them and, given a git diff,
+selects only the affected scenarios. Dependencies come from two places:
+
+- Static analysis. Each scenario's steps are matched to their step
+  definitions, whose dependencies are followed through names, imports and
+  attribute names. For example, page_factory.login_page leads to
+  PageFactory.login_page, LoginPage and the LoginPage, BasePage and
+  Locators members it uses. JSON schemas are linked to the steps that name
+  them, and streamed data files to the scenarios whose steps name them.
+  Everything the environment hooks reach affects every scenario.
+- A recorded coverage map (SCENARIO_COVERAGE_MAP). It lists the repo
+  functions each scenario actually executed, which catches what the static
+  analysis cannot see.
+
+Changes are resolved to functions, classes and class members, so editing
+one page method or one locator only selects the scenarios that reach it.
+Changes outside any definition (imports, module code) count as a change to
+the whole file.
+
+Usage:
+    python -m utils.test_selection --base origin/main
+    python -m utils.test_selection --base origin/main --explain
+    python -m utils.test_selection --base origin/main --run -- --tags=@ui
+    python -m utils.parallel_runner --changed-since origin/main
+"""
+
+import argparse
+import ast
+import glob
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from behave.matchers import ParseMatcher
+from behave.parser import parse_file
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATTERNS = ("features/*.py", "features/steps/*.py", "pages/*.py", "utils/*.py")
+FEATURE_PATTERN = "features/*.feature"
+SCHEMA_PATTERN = "schemas/*.json"
+DATA_PATTERN = "features/data/*"
+STEPS_PATTERN = "features/steps/*.py"
+ENVIRONMENT = "features/environment.py"
+STEP_DECORATORS = {"given", "when", "then", "step", "Given", "When", "Then", "Step"}
+
+# Changes to these select every scenario
+GLOBAL_PATHS = ("requirements.txt", "behave.ini", ".behaverc", "setup.cfg", "tox.ini")
+
+# Symbol standing for a file's module-level code, or the whole file
+MODULE = ""
+
+COVERAGE_MAP_FORMAT = 1
+
+HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+Dependency = Tuple[str, str]
+
+
+class Symbol:
+    """A top-level definition or class member with the names it uses"""
+
+    def __init__(self, name: str, start: int, end: int):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.names: Set[str] = set()
+        self.attributes: Set[str] = set()
+        self.strings: Set[str] = set()
+
+    def collect(self, nodes: Iterable[ast.AST]) -> None:
+        for node in nodes:
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name):
+                    self.names.add(child.id)
+                elif isinstance(child, ast.Attribute):
+                    self.attributes.add(child.attr)
+                elif isinstance(child, ast.Constant) and isinstance(child.value, str):
+                    self.strings.add(child.value)
+
+
+class SourceFile:
+    """Line ranges of the symbols in one file, plus a Python module's imports"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.symbols: Dict[str, Symbol] = {}
+        self.classes: Set[str] = set()
+        self.imports: Dict[str, Tuple[str, Optional[str]]] = {}
+
+    def symbol_at(self, line: int) -> str:
+        """Innermost symbol containing line, or MODULE"""
+        best = None
+        for symbol in self.symbols.values():
+            if symbol.start <= line <= symbol.end and (best is None or symbol.start >= best.start):
+                best = symbol
+        return best.name if best else MODULE
+
+    @classmethod
+    def parse_python(cls, path: str) -> "SourceFile":
+        source = cls(path)
+        with open(os.path.join(ROOT, path), "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                source._add_import(node)
+            elif isinstance(node, ast.ClassDef):
+                source._add_class(node)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                source._add_symbol(node.name, node, [node])
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        source._add_symbol(target.id, node, [node])
+        return source
+
+    @classmethod
+    def parse_feature(cls, path: str) -> "SourceFile":
+        """Each top-level Scenario or Scenario Outline is a symbol"""
+        source = cls(path)
+        feature = parse_file(os.path.join(ROOT, path))
+        if feature is None:
+            return source
+        blocks = sorted(feature.scenarios, key=lambda scenario: scenario.line)
+        with open(os.path.join(ROOT, path), "r", encoding="utf-8") as f:
+            last_line = sum(1 for _ in f)
+        for index, scenario in enumerate(blocks):
+            # Tags above a scenario belong to it
+            start = min([scenario.line, *(tag.line for tag in scenario.tags if hasattr(tag, "line"))])
+            end = blocks[index + 1].line - 1 if index + 1 < len(blocks) else last_line
+            source.symbols[scenario_block(scenario)] = Symbol(scenario_block(scenario), start, end)
+        return source
+
+    def _add_symbol(self, name: str, node: ast.AST, nodes: List[ast.AST]) -> Symbol:
+        decorators = getattr(node, "decorator_list", [])
+        start = min([node.lineno, *(decorator.lineno for decorator in decorators)])
+        symbol = self.symbols.setdefault(name, Symbol(name, start, node.end_lineno))
+        symbol.start, symbol.end = min(symbol.start, start), max(symbol.end, node.end_lineno)
+        symbol.collect(nodes)
+        return symbol
+
+    def _add_class(self, node: ast.ClassDef) -> None:
+        self.classes.add(node.name)
+        members, header = [], [*node.bases, *node.keywords, *node.decorator_list]
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                members.append((item.name, item))
+            elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+                targets = item.targets if isinstance(item, ast.Assign) else [item.target]
+                members.extend((target.id, item) for target in targets if isinstance(target, ast.Name))
+            else:
+                header.append(item)
+        self._add_symbol(node.name, node, header)
+        for name, item in members:
+            self._add_symbol(f"{node.name}.{name}", item, [item])
+
+    def _add_import(self, node: ast.AST) -> None:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                path = module_path(alias.name)
+                if path and alias.asname:
+                    self.imports[alias.asname] = (path, None)
+            return
+        path = module_path(node.module or "") if node.level == 0 else None
+        if path is None:
+            return
+        for alias in node.names:
+            submodule = module_path(f"{node.module}.{alias.name}")
+            if submodule:
+                self.imports[alias.asname or alias.name] = (submodule, None)
+            else:
+                self.imports[alias.asname or alias.name] = (path, alias.name)
+
+
+def module_path(module: str) -> Optional[str]:
+    """Repo-relative file of a dotted module name, or None outside the repo"""
+    if not module:
+        return None
+    base = module.replace(".", "/")
+    for candidate in (f"{base}.py", f"{base}/__init__.py"):
+        if os.path.isfile(os.path.join(ROOT, candidate)):
+            return candidate
+    return None
+
+
+def scenario_block(scenario) -> str:
+    """Symbol name of a top-level Scenario or Scenario Outline"""
+    return f"{scenario.keyword}: {scenario.name}"
+
+
+def scenario_key(scenario) -> str:
+    """Stable identity of a scenario (one per outline row) across line changes"""
+    return f"{relative(scenario.filename)}::{scenario.name}"
+
+
+def relative(path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, "/")
+
+
+def _glob(pattern: str) -> List[str]:
+    return sorted(relative(path) for path in glob.glob(os.path.join(ROOT, pattern)))
+
+
+class StepDefinition:
+    """A step pattern and the function implementing it"""
+
+    def __init__(self, step_type: str, pattern: str, path: str, function: str):
+        self.step_type = step_type
+        self.path = path
+        self.function = function
+        self.matcher = ParseMatcher(None, pattern, step_type)
+
+    def matches(self, text: str) -> bool:
+        return self.matcher.match(text) is not None
+
+
+class SourceIndex:
+    """Symbols of the repo's sources, feature files, schemas and data files, and their dependencies"""
+
+    def __init__(self):
+        self.files: Dict[str, SourceFile] = {}
+        for pattern in SOURCE_PATTERNS:
+            for path in _glob(pattern):
+                self.files[path] = SourceFile.parse_python(path)
+        for path in _glob(FEATURE_PATTERN):
+            self.files[path] = SourceFile.parse_feature(path)
+        self.schemas = {os.path.basename(path): path for path in _glob(SCHEMA_PATTERN)}
+        self.data_files = {os.path.basename(path): path for path in _glob(DATA_PATTERN)}
+        for path in [*self.schemas.values(), *self.data_files.values()]:
+            self.files[path] = SourceFile(path)
+        self.step_definitions = self._step_definitions()
+        self._closures: Dict[Dependency, Set[Dependency]] = {}
+
+    def _step_definitions(self) -> List[StepDefinition]:
+        definitions = []
+        for path in _glob(STEPS_PATTERN):
+            with open(os.path.join(ROOT, path), "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+            for node in tree.body:
+                if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                for decorator in node.decorator_list:
+                    if (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Name)
+                            and decorator.func.id in STEP_DECORATORS and decorator.args
+                            and isinstance(decorator.args[0], ast.Constant)):
+                        step_type = decorator.func.id.lower()
+                        definitions.append(StepDefinition(step_type, decorator.args[0].value, path, node.name))
+        return definitions
+
+    def find_step(self, step) -> Optional[StepDefinition]:
+        """Step definition behave would run for a step, by type then generic @step"""
+        for definition in self.step_definitions:
+            if definition.step_type == step.step_type and definition.matches(step.name):
+                return definition
+        for definition in self.step_definitions:
+            if definition.step_type == "step" and definition.matches(step.name):
+                return definition
+        return None
+
+    def closure(self, roots: Iterable[Dependency]) -> Set[Dependency]:
+        """Every symbol reachable from roots through names, imports and attribute names"""
+        roots = tuple(roots)
+        if len(roots) == 1 and roots[0] in self._closures:
+            return self._closures[roots[0]]
+        dependencies: Set[Dependency] = set()
+        attributes: Set[str] = set()
+        pending = list(roots)
+        while pending:
+            while pending:
+                path, name = pending.pop()
+                if (path, name) in dependencies:
+                    continue
+                source = self.files.get(path)
+                symbol = source.symbols.get(name) if source else None
+                if symbol is None:
+                    continue
+                dependencies.add((path, name))
+                if name in source.classes and f"{name}.__init__" in source.symbols:
+                    pending.append((path, f"{name}.__init__"))
+                for used in symbol.names:
+                    pending.extend(self._resolve(path, used))
+                attributes |= symbol.attributes
+                for string in symbol.strings:
+                    if string in self.schemas:
+                        dependencies.add((self.schemas[string], MODULE))
+            # Attributes are matched by name against the classes reached so far
+            for path, name in list(dependencies):
+                source = self.files[path]
+                if name in source.classes:
+                    pending.extend(
+                        (path, f"{name}.{attribute}") for attribute in attributes
+                        if f"{name}.{attribute}" in source.symbols
+                        and (path, f"{name}.{attribute}") not in dependencies
+                    )
+        if len(roots) == 1:
+            self._closures[roots[0]] = dependencies
+        return dependencies
+
+    def _resolve(self, path: str, name: str, depth: int = 0) -> List[Dependency]:
+        source = self.files[path]
+        if name in source.symbols:
+            return [(path, name)]
+        if name not in source.imports or depth > 5:
+            return []
+        target, imported = source.imports[name]
+        if target not in self.files:
+            return []
+        if imported is None:
+            return [(target, MODULE)]
+        return self._resolve(target, imported, depth + 1)
+
+    def global_dependencies(self) -> Set[Dependency]:
+        """Symbols reached from the environment hooks, which run for every scenario"""
+        environment = self.files.get(ENVIRONMENT)
+        if environment is None:
+            return set()
+        return self.closure((ENVIRONMENT, name) for name in environment.symbols) | {(ENVIRONMENT, MODULE)}
+
+    def scenario_dependencies(self) -> Dict[str, Tuple[str, Set[Dependency]]]:
+        """Location and static dependencies of every scenario, by scenario key"""
+        scenarios = {}
+        for path in _glob(FEATURE_PATTERN):
+            feature = parse_file(os.path.join(ROOT, path))
+            if feature is None:
+                continue
+            for block in feature.scenarios:
+                for scenario in getattr(block, "scenarios", [block]):
+                    dependencies = {(path, scenario_block(block))}
+                    steps = [*(feature.background.steps if feature.background else []), *scenario.steps]
+                    for step in steps:
+                        dependencies |= {
+                            (self.data_files[name], MODULE) for name in re.findall(r'"([^"]*)"', step.name)
+                            if name in self.data_files
+                        }
+                        definition = self.find_step(step)
+                        if definition is not None:
+                            dependencies |= self.closure([(definition.path, definition.function)])
+                    scenarios[scenario_key(scenario)] = (f"{path}:{scenario.line}", dependencies)
+        return scenarios
+
+
+# ============================================================================
+# Changes
+# ============================================================================
+
+def git_diff(base: str) -> str:
+    """Unified diff, without context, from base to the working tree"""
+    return subprocess.run(
+        ["git", "diff", "--unified=0", "--no-color", "--no-ext-diff", "--no-renames", base, "--"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+
+
+def changed_symbols(diff: str, index: SourceIndex) -> Dict[str, Set[str]]:
+    """Changed symbols per file; MODULE marks module-level or whole-file changes"""
+    changes: Dict[str, Set[str]] = {}
+    path = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            path = None
+        elif line.startswith("--- "):
+            old = line[4:]
+            path = old[2:] if old != "/dev/null" else None
+        elif line.startswith("+++ "):
+            new = line[4:]
+            if new == "/dev/null":
+                changes.setdefault(path, set()).add(MODULE)
+            else:
+                if path is None:
+                    changes.setdefault(new[2:], set()).add(MODULE)
+                path = new[2:]
+        elif line.startswith("Binary files ") and path:
+            changes.setdefault(path, set()).add(MODULE)
+        elif path and (match := HUNK.match(line)):
+            start = int(match.group(1))
+            count = int(match.group(2) if match.group(2) is not None else 1)
+            # A pure deletion sits between two lines; charge both neighbours
+            lines = range(start, start + count) if count else (start, start + 1)
+            source = index.files.get(path)
+            symbols = changes.setdefault(path, set())
+            for number in lines:
+                symbols.add(source.symbol_at(number) if source else MODULE)
+    return changes
+
+
+def affected_by(changes: Dict[str, Set[str]], dependencies: Iterable[Dependency]) -> Optional[Dependency]:
+    """First dependency touched by the changes, or None"""
+    for path, name in dependencies:
+        changed = changes.get(path)
+        if changed and MODULE in changed:
+            return path, MODULE
+        if changed and name in changed:
+            return path, name
+    return None
+
+
+# ============================================================================
+# Coverage map
+# ============================================================================
+
+def code_symbol(code) -> str:
+    """Symbol name of a code object, e.g. BasePage.snapshot for a method or its closures"""
+    qualname = getattr(code, "co_qualname", code.co_name)
+    if qualname == "<module>":
+        return MODULE
+    return ".".join(qualname.split(".<locals>.")[0].split(".")[:2])
+
+
+def load_coverage_map(path: Optional[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Recorded symbols per file for each scenario key, or {} if there is no map"""
+    if not path or not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as error:
+        logger.warning("Ignoring unreadable coverage map %s: %s", path, error)
+        return {}
+    if data.get("format") != COVERAGE_MAP_FORMAT:
+        logger.warning("Ignoring coverage map %s with format %s", path, data.get("format"))
+        return {}
+    return data.get("scenarios", {})
+
+
+class CoverageRecorder:
+    """Records which repo functions each scenario executes into a coverage map.
+
+    Uses a profile hook, so it slows scenarios down; record the map in a
+    periodic run rather than in every CI run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.scenarios: Dict[str, Dict[str, List[str]]] = {}
+        self._codes = set()
+
+    @classmethod
+    def from_env(cls) -> Optional["CoverageRecorder"]:
+        """Recorder writing to SCENARIO_COVERAGE_MAP, or None if it is not set"""
+        path = os.getenv("SCENARIO_COVERAGE_MAP")
+        return cls(path) if path else None
+
+    def start(self) -> None:
+        self._codes = set()
+        threading.setprofile(self._profile)
+        sys.setprofile(self._profile)
+
+    def stop(self, scenario) -> None:
+        """Stop recording and store the functions the scenario ran"""
+        sys.setprofile(None)
+        threading.setprofile(None)
+        files: Dict[str, Set[str]] = {}
+        for code in self._codes:
+            path = os.path.abspath(code.co_filename)
+            if not path.startswith(ROOT + os.sep) or not os.path.isfile(path):
+                continue
+            files.setdefault(relative(path), set()).add(code_symbol(code))
+        self.scenarios[scenario_key(scenario)] = {path: sorted(names) for path, names in sorted(files.items())}
+
+    def write(self) -> None:
+        """Merge this run's scenarios into the map, which parallel workers share"""
+        if not self.scenarios:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with file_lock(self.path):
+            scenarios = load_coverage_map(self.path)
+            scenarios.update(self.scenarios)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"format": COVERAGE_MAP_FORMAT, "scenarios": scenarios}, f, indent=1)
+            os.replace(tmp_path, self.path)
+        logger.info("Recorded coverage for %d scenarios in %s", len(self.scenarios), self.path)
+
+    def _profile(self, frame, event, arg):  # pylint: disable=unused-argument
+        if event == "call":
+            self._codes.add(frame.f_code)
+
+
+# ============================================================================
+# Selection
+# ============================================================================
+
+class Selection:
+    """Scenarios to run for a change, with the dependency that selected each"""
+
+    def __init__(self, run_all: bool, locations: List[str], reasons: Dict[str, str]):
+        self.run_all = run_all
+        self.locations = locations
+        self.reasons = reasons
+
+
+def select_scenarios(base: str, coverage_map: Optional[str] = None,
+                     diff: Optional[str] = None) -> Selection:
+    """Scenarios affected by the changes between base and the working tree"""
+    index = SourceIndex()
+    changes = changed_symbols(git_diff(base) if diff is None else diff, index)
+    if not changes:
+        return Selection(False, [], {})
+
+    for path in changes:
+        if path in GLOBAL_PATHS:
+            return Selection(True, [], {"*": path})
+    trigger = affected_by(changes, index.global_dependencies())
+    if trigger is not None:
+        return Selection(True, [], {"*": describe(trigger)})
+
+    recorded = load_coverage_map(coverage_map)
+    locations, reasons = [], {}
+    for key, (location, dependencies) in index.scenario_dependencies().items():
+        trigger = affected_by(changes, dependencies)
+        if trigger is None:
+            trigger = affected_by(changes, (
+                (path, name) for path, names in recorded.get(key, {}).items() for name in names
+            ))
+        if trigger is not None:
+            locations.append(location)
+            reasons[location] = describe(trigger)
+    return Selection(False, locations, reasons)
+
+
+def describe(dependency: Dependency) -> str:
+    path, name = dependency
+    return f"{path}:{name}" if name else path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Select the scenarios affected by changes since a git revision")
+    parser.add_argument("--base", default="origin/main", help="git revision to diff against (default: origin/main)")
+    parser.add_argument("--coverage-map", default=os.getenv("SCENARIO_COVERAGE_MAP"),
+                        help="recorded coverage map to add to the static analysis")
+    parser.add_argument("--explain", action="store_true", help="log the change that selected each scenario")
+    parser.add_argument("--run", action="store_true", help="run behave on the selected scenarios")
+    parser.add_argument("behave_args", nargs="*", help="extra behave arguments for --run (after --)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    selection = select_scenarios(args.base, args.coverage_map)
+    if selection.run_all:
+        logger.info("Running every scenario: %s changed", selection.reasons["*"])
+    elif not selection.locations:
+        logger.info("No scenarios affected by changes since %s", args.base)
+        return 0
+    else:
+        logger.info("%d scenarios affected by changes since %s", len(selection.locations), args.base)
+        if args.explain:
+            for location in selection.locations:
+                logger.info("  %s <- %s", location, selection.reasons[location])
+
+    if not args.run:
+        print("\n".join(selection.locations or ["features"]))
+        return 0
+    command = [sys.executable, "-m", "behave", *args.behave_args, *selection.locations]
+    return subprocess.call(command, cwd=ROOT)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
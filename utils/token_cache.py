@@ -0,0 +1,98 @@
+"""
+Auth token cache for the restful-booker API.
+
+Tokens are keyed by base URL and username, expire after a TTL and are kept in
+a small JSON file guarded by a file lock, so parallel workers share them and a
+whole run needs a single /auth POST per target.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Optional
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 600
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "behave-auth-tokens.json")
+
+
+class TokenCache:
+    """Process-local and on-disk cache of auth tokens with a TTL"""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._memory = {}
+
+    @classmethod
+    def from_env(cls) -> "TokenCache":
+        """Build a cache from AUTH_TOKEN_CACHE and AUTH_TOKEN_TTL"""
+        return cls(
+            path=os.getenv("AUTH_TOKEN_CACHE", DEFAULT_PATH),
+            ttl=float(os.getenv("AUTH_TOKEN_TTL", DEFAULT_TTL)),
+        )
+
+    @staticmethod
+    def _key(base_url: str, username: str) -> str:
+        return f"{base_url}|{username}"
+
+    def get_or_fetch(self, base_url: str, username: str, fetch: Callable[[], str]) -> str:
+        """Return a cached token, calling fetch() under the file lock on a miss.
+
+        Holding the lock while fetching means concurrent workers wait for the
+        first one's token instead of each POSTing to /auth.
+        """
+        key = self._key(base_url, username)
+        token = self._valid_token(key, self._memory.get(key))
+        if token:
+            return token
+
+        with self._locked():
+            entries = self._read()
+            token = self._valid_token(key, entries.get(key))
+            if token:
+                return token
+            token = fetch()
+            entry = {"token": token, "expires": time.time() + self.ttl}
+            entries[key] = entry
+            self._write(entries)
+        self._memory[key] = entry
+        return token
+
+    def invalidate(self, base_url: str, username: str) -> None:
+        """Drop a token, e.g. after the API rejected it with a 403"""
+        key = self._key(base_url, username)
+        self._memory.pop(key, None)
+        with self._locked():
+            entries = self._read()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+        logger.info("Invalidated auth token for %s", key)
+
+    def _valid_token(self, key: str, entry: Optional[dict]) -> Optional[str]:
+        if entry is None or entry["expires"] <= time.time():
+            self._memory.pop(key, None)
+            return None
+        self._memory[key] = entry
+        return entry["token"]
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: dict) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def _locked(self):
+        return file_lock(self.path)